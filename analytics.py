@@ -0,0 +1,482 @@
+"""
+Derived tables computed from the typed sheet frames.
+
+Every function here is pure: it takes frames, never modifies them, and returns
+a new frame. Pages build them through DataView.derive() so each one runs once
+per data version.
+"""
+import re
+import threading
+import weakref
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from schema import POWER_COLUMNS, normalize_power
+
+
+def completed_weeks(matchups):
+    """Sorted weeks in which any team has scored (> 0 points)."""
+    scored = matchups.loc[matchups["pts"] > 0, "week"].dropna().unique()
+    return sorted(scored.tolist())
+
+
+def _home_flags(matchups):
+    """True where a row is the home side, from the sheet's 'home' column."""
+    text = matchups["home"].astype(str).str.strip().str.lower()
+    return text.isin(["h", "home", "true", "1", "yes"]).to_numpy()
+
+
+def matchup_pairs(matchups):
+    """
+    One row per game for every week, indexed by week:
+    Team, Points, Opponent, Opp Points, Winner, Margin, and Home, Away when
+    the sheet has a 'home' column. Team/Opponent are ordered alphabetically;
+    Winner is "Tie" on equal scores and missing for unplayed games.
+    """
+    has_home = "home" in matchups.columns
+    cols = ["week", "team", "opp", "pts"]
+    m = matchups[cols].dropna(subset=["week"]).reset_index(drop=True)
+    if has_home:
+        m["home"] = _home_flags(matchups.dropna(subset=["week"]))
+
+    pairs = m.merge(m, left_on=["week", "team"], right_on=["week", "opp"], suffixes=("_team", "_opp"))
+    pairs = pairs[pairs["team_team"] < pairs["team_opp"]]
+
+    team, opp = pairs["team_team"].to_numpy(), pairs["team_opp"].to_numpy()
+    pts, opp_pts = pairs["pts_team"].to_numpy(dtype=float), pairs["pts_opp"].to_numpy(dtype=float)
+    played = ~(np.isnan(pts) | np.isnan(opp_pts))
+    winner = np.where(pts > opp_pts, team, np.where(pts < opp_pts, opp, "Tie"))
+
+    out = pd.DataFrame({
+        "week": pairs["week"].to_numpy(),
+        "Team": team,
+        "Points": pts,
+        "Opponent": opp,
+        "Opp Points": opp_pts,
+        "Winner": np.where(played, winner, None),
+        "Margin": np.abs(pts - opp_pts).round(2),
+    })
+    if has_home:
+        team_home = pairs["home_team"].to_numpy()
+        out["Home"] = np.where(team_home, team, opp)
+        out["Away"] = np.where(team_home, opp, team)
+    return out.set_index("week").sort_index(kind="stable")
+
+
+class SeasonTotals:
+    """
+    PF/PA per team, maintained incrementally across data versions.
+
+    Each week's rows are fingerprinted; only weeks that are new, changed (a
+    stat correction) or gone are folded in or out. Unchanged history is never
+    re-aggregated.
+    """
+
+    def __init__(self):
+        self._digests = {}                       # week key -> digest of that week's rows
+        self._week_pf = pd.Series(dtype=float)   # (week key..., team) -> points for
+        self._week_pa = pd.Series(dtype=float)   # (week key..., team) -> points against
+        self._pf = pd.Series(dtype=float)
+        self._pa = pd.Series(dtype=float)
+        self._lock = threading.Lock()
+
+    def update(self, matchups):
+        """Fold `matchups` in and return the leaderboard (team, PF, PA, Diff)."""
+        keys = [c for c in ("season", "week") if c in matchups.columns]
+        rows = matchups[keys + ["team", "opp", "pts"]]
+        week_key = [rows[k] for k in keys]
+        digests = pd.util.hash_pandas_object(rows, index=False).groupby(week_key).sum().to_dict()
+
+        with self._lock:
+            changed = [k for k, d in digests.items() if self._digests.get(k) != d]
+            stale = changed + [k for k in self._digests if k not in digests]
+            if stale:
+                self._fold_out(stale)
+            if changed:
+                fresh = rows[pd.MultiIndex.from_arrays(week_key).isin(changed)] if len(keys) > 1 \
+                    else rows[rows[keys[0]].isin(changed)]
+                self._fold_in(fresh, keys)
+            self._digests = digests
+            pf, pa = self._pf, self._pa
+
+        board = pd.DataFrame({"PF": pf, "PA": pa}).fillna(0).round(2)
+        board["Diff"] = board["PF"] - board["PA"]
+        board = board.rename_axis("team").reset_index()
+        return board.sort_values("Diff", ascending=False).reset_index(drop=True)
+
+    def _fold_out(self, weeks):
+        for attr, total in (("_week_pf", "_pf"), ("_week_pa", "_pa")):
+            parts = getattr(self, attr)
+            if parts.empty:
+                continue
+            gone = parts.index.droplevel(-1).isin(weeks)
+            kept = parts[~gone]
+            totals = getattr(self, total).sub(parts[gone].groupby(level=-1).sum(), fill_value=0)
+            # Teams with no weeks left (e.g. renamed) leave the board instead of lingering at 0
+            setattr(self, total, totals[totals.index.isin(kept.index.get_level_values(-1))])
+            setattr(self, attr, kept)
+
+    def _fold_in(self, rows, keys):
+        pf = rows.groupby(keys + ["team"])["pts"].sum()
+        pa = rows.groupby(keys + ["opp"])["pts"].sum().rename_axis(keys + ["team"])
+        self._week_pf = pd.concat([self._week_pf, pf]) if not self._week_pf.empty else pf
+        self._week_pa = pd.concat([self._week_pa, pa]) if not self._week_pa.empty else pa
+        self._pf = self._pf.add(pf.groupby(level=-1).sum(), fill_value=0)
+        self._pa = self._pa.add(pa.groupby(level=-1).sum(), fill_value=0)
+
+
+_season_totals = {}   # (league, season) namespace -> SeasonTotals
+
+
+def season_totals(matchups, namespace=None):
+    """Leaderboard from the process-wide incremental accumulator for `namespace`."""
+    return _season_totals.setdefault(namespace, SeasonTotals()).update(matchups)
+
+
+def forget(namespace):
+    """Drop per-namespace accumulators (when a league is unloaded)."""
+    _season_totals.pop(namespace, None)
+
+
+# -----------------------------------
+# All-Play engine
+# -----------------------------------
+def _rank_within(groups, scores):
+    """
+    For each score, count strictly lower / strictly higher / equal (other)
+    scores in the same group. Vectorized with one lexsort; no Python loop.
+    """
+    n = len(scores)
+    order = np.lexsort((scores, groups))
+    g, s = groups[order], scores[order]
+    idx = np.arange(n)
+
+    group_break = np.diff(g) != 0
+    value_break = group_break | (np.diff(s) != 0)
+    first_of_value = np.maximum.accumulate(np.where(np.r_[True, value_break], idx, 0))
+    last_of_value = np.minimum.accumulate(np.where(np.r_[value_break, True], idx, n)[::-1])[::-1]
+    group_start = np.maximum.accumulate(np.where(np.r_[True, group_break], idx, 0))
+    group_end = np.minimum.accumulate(np.where(np.r_[group_break, True], idx, n)[::-1])[::-1]
+
+    out = np.empty((3, n), dtype=np.int64)
+    out[0, order] = first_of_value - group_start   # wins
+    out[1, order] = group_end - last_of_value      # losses
+    out[2, order] = last_of_value - first_of_value  # ties
+    return out
+
+
+def allplay_weekly(matchups):
+    """
+    Per-team, per-week all-play record from raw scores: each team's score is
+    compared with every other score that week. Returns week (and season if
+    present), team, pts, the week's W/L/T, and season-cumulative Wins, Losses,
+    Ties and Win% (ties count half). Empty (same layout) when matchups lack
+    week, team or pts, e.g. when the tab failed to load.
+    """
+    keys = [c for c in ("season", "week") if c in matchups.columns]
+    if not {"week", "team", "pts"} <= set(matchups.columns):
+        return pd.DataFrame(columns=keys + ["team", "pts", "W", "L", "T", "Wins", "Losses", "Ties", "Win%"])
+    played = matchups["week"].isin(completed_weeks(matchups)) & matchups["pts"].notna()
+    rows = matchups.loc[played, keys + ["team", "pts"]].sort_values(keys, kind="stable").reset_index(drop=True)
+    if rows.empty:
+        return rows.assign(W=0, L=0, T=0, Wins=0, Losses=0, Ties=0, **{"Win%": 0.0})
+
+    groups = pd.MultiIndex.from_frame(rows[keys]).factorize()[0] if len(keys) > 1 else pd.factorize(rows[keys[0]])[0]
+    rows["W"], rows["L"], rows["T"] = _rank_within(groups, rows["pts"].to_numpy(dtype=float))
+
+    by_team = rows.groupby(keys[:-1] + ["team"], sort=False)[["W", "L", "T"]].cumsum()
+    rows["Wins"], rows["Losses"], rows["Ties"] = by_team["W"], by_team["L"], by_team["T"]
+    games = rows["Wins"] + rows["Losses"] + rows["Ties"]
+    rows["Win%"] = ((rows["Wins"] + 0.5 * rows["Ties"]) / games.where(games > 0)).round(3)
+    return rows
+
+
+def allplay_standings(matchups):
+    """Current all-play table (Team, team_id, Wins, Losses, Ties, Win%) in the All-Play tab's layout."""
+    weekly = allplay_weekly(matchups)
+    if weekly.empty:
+        return pd.DataFrame(columns=["team_id", "Team", "Wins", "Losses", "Ties", "Win%"])
+    if "season" in weekly.columns:
+        weekly = weekly[weekly["season"] == weekly["season"].max()]
+    latest = weekly.groupby("team", sort=False).tail(1)
+    return pd.DataFrame({
+        "team_id": latest["team"].to_numpy(),
+        "Team": latest["team"].to_numpy(),
+        "Wins": latest["Wins"].to_numpy(),
+        "Losses": latest["Losses"].to_numpy(),
+        "Ties": latest["Ties"].to_numpy(),
+        "Win%": latest["Win%"].to_numpy(),
+    }).sort_values("Win%", ascending=False, kind="stable").reset_index(drop=True)
+
+
+# -----------------------------------
+# Power engine
+# -----------------------------------
+# Power Index = weighted sum of league z-scores
+POWER_WEIGHTS = {
+    "All-Play %": 0.40,
+    "Avg Margin": 0.25,
+    "Recent Form (3-wk avg)": 0.20,
+    "SoS Played": 0.15,
+}
+FORM_WEEKS = 3
+
+
+def _team_games(matchups):
+    """Latest season's matchup rows with the opponent's score and a played flag, sorted by week."""
+    m = matchups
+    if "season" in m.columns:
+        m = m[m["season"] == m["season"].max()]
+    m = m[["week", "team", "opp", "pts"]].dropna(subset=["week"]).sort_values("week", kind="stable")
+    opp_pts = m.rename(columns={"team": "opp", "opp": "team", "pts": "opp_pts"})
+    m = m.merge(opp_pts, on=["week", "team", "opp"], how="left")
+    m["played"] = m["week"].isin(completed_weeks(m)) & m["pts"].notna() & m["opp_pts"].notna()
+    return m
+
+
+def power_rankings(matchups, through_week=None):
+    """
+    The Power Rankings table computed from `matchups` as of `through_week`
+    (default: every completed week), in the layout normalize_power() expects,
+    and normalized by it. Returns (frame, missing_columns).
+
+    SoS Played / Remaining are the mean points-per-game (through the cutoff)
+    of opponents faced / still to face (the league's points-per-game when no
+    games are left); SoS Δ vs Avg is SoS Remaining minus the league's
+    points-per-game. Power Index weights are in POWER_WEIGHTS.
+    """
+    games = _team_games(matchups)
+    if through_week is not None:
+        games["played"] &= games["week"] <= through_week
+    done = games[games["played"]]
+    if done.empty:
+        return normalize_power(pd.DataFrame(columns=POWER_COLUMNS))
+
+    margin = done["pts"] - done["opp_pts"]
+    result = np.sign(margin).to_numpy() * 0.5 + 0.5           # 1 win, 0.5 tie, 0 loss
+    ap = _rank_within(pd.factorize(done["week"])[0], done["pts"].to_numpy(dtype=float))
+    ap_games = ap.sum(axis=0)
+    by_team = pd.DataFrame({
+        "team": done["team"].to_numpy(),
+        "pts": done["pts"].to_numpy(),
+        "margin": margin.to_numpy(),
+        "result": result,
+        "ap": (ap[0] + 0.5 * ap[2]) / np.where(ap_games > 0, ap_games, np.nan),
+    }).groupby("team", sort=True)
+
+    table = by_team.agg(PF=("pts", "sum"), games=("pts", "size"), margin=("margin", "mean"),
+                        win=("result", "mean"), ap=("ap", "mean"))
+    recent = done.assign(margin=margin).groupby("team").tail(FORM_WEEKS).groupby("team")[["pts", "margin"]].mean()
+
+    ppg = table["PF"] / table["games"]
+    opp_ppg = games["opp"].map(ppg)
+    sos_played = opp_ppg[games["played"]].groupby(games["team"]).mean()
+    # With no games left (season over), remaining schedule strength is the league average
+    sos_left = opp_ppg[~games["played"]].groupby(games["team"]).mean().reindex(table.index).fillna(ppg.mean())
+
+    table = pd.DataFrame({
+        "Team": table.index,
+        "PF": table["PF"].round(2),
+        "All-Play %": (table["ap"] * 100).round(1),
+        "Actual Win %": (table["win"] * 100).round(1),
+        "Avg Margin": table["margin"].round(1),
+        "Recent Form (3-wk avg)": recent["pts"].round(1),
+        "Recent Margin (3-wk avg)": recent["margin"].round(1),
+        "SoS Played": sos_played.reindex(table.index).round(1),
+        "SoS Remaining": sos_left.round(1),
+        "SoS Δ vs Avg": (sos_left - ppg.mean()).round(1),
+    }).reset_index(drop=True)
+
+    z = table[list(POWER_WEIGHTS)]
+    z = (z - z.mean()) / z.std(ddof=0).replace(0, np.nan)
+    table["Power Index"] = (z.fillna(0) * pd.Series(POWER_WEIGHTS)).sum(axis=1).round(2)
+    table.insert(0, "Rank", table["Power Index"].rank(method="first", ascending=False).astype(int))
+    return normalize_power(table)
+
+
+# -----------------------------------
+# Power table from either source
+# -----------------------------------
+_power_memo = {}   # (id(source), from_sheet, through_week) -> (weakref to source, (frame, missing))
+_power_lock = threading.Lock()
+
+
+def power_frame(source, from_sheet=False, through_week=None):
+    """
+    (frame, missing_columns): the Power tab normalized (`from_sheet`) or the
+    table computed from matchups. Memoized on the identity of `source`, since
+    DataView hands every derive of a version the same frozen frame. The
+    power-derived tables below therefore share one computation with the page's.
+    """
+    key = (id(source), from_sheet, through_week)
+    with _power_lock:
+        hit = _power_memo.get(key)
+        if hit is not None and hit[0]() is source:
+            return hit[1]
+    result = normalize_power(source) if from_sheet else power_rankings(source, through_week=through_week)
+    with _power_lock:
+        # The entry goes when its source frame does (the data version was replaced)
+        _power_memo[key] = (weakref.ref(source, lambda _ref, key=key: _power_memo.pop(key, None)), result)
+    return result
+
+
+def power_correlation(source, metrics, from_sheet=False):
+    """Pairwise correlation of each of `metrics` with Power Index."""
+    power, _ = power_frame(source, from_sheet)
+    return power[list(metrics) + ["Power Index"]].corr(numeric_only=True)["Power Index"]
+
+
+def power_metric_matrix(source, metrics, from_sheet=False):
+    """metric_matrix() of the power table built from `source`."""
+    power, _ = power_frame(source, from_sheet)
+    return metric_matrix(power, metrics)
+
+
+# -----------------------------------
+# Normalized metric matrix (radars)
+# -----------------------------------
+# values[row] is one team's metrics scaled 0-100 across the league; teams maps name -> row
+MetricMatrix = namedtuple("MetricMatrix", ["values", "teams", "metrics"])
+
+
+def metric_matrix(power, metrics):
+    """Min-max scale `metrics` of `power` to 0-100 once, as a read-only array indexed by team."""
+    values = power[list(metrics)].to_numpy(dtype=float)
+    lo, hi = np.nanmin(values, axis=0), np.nanmax(values, axis=0)
+    span = np.where(hi > lo, hi - lo, 1.0)
+    scaled = (values - lo) / span * 100
+    scaled.setflags(write=False)
+    teams = {team: row for row, team in enumerate(power["Team"]) if pd.notna(team)}
+    return MetricMatrix(scaled, teams, tuple(metrics))
+
+
+# -----------------------------------
+# Injury report
+# -----------------------------------
+# Status codes, most severe first; anything unrecognized (or blank) is Other
+INJURY_STATUSES = ("Out", "IR", "Doubtful", "Questionable", "Other", "Healthy")
+
+# rows: injured players only (with a categorical "status_code" column)
+# teams: team -> row positions in `rows`; counts: injured players per team, most first
+InjuryReport = namedtuple("InjuryReport", ["rows", "teams", "counts", "team_col", "status_col"])
+
+
+def _classify_statuses(text):
+    """np.select over upper-cased status strings -> int codes into INJURY_STATUSES."""
+    text = pd.Series(text, dtype="str").str.upper().str.strip()
+    conditions = [
+        # Same healthy rule the page used to apply with str.contains
+        text.str.contains("ACTIVE|HEALTHY|NONE", regex=True),
+        text.str.startswith("OUT") | (text == "O"),
+        text.str.contains("RESERVE", regex=False) | text.isin(["IR", "IR-R", "PUP"]),
+        text.str.startswith("DOUBT") | (text == "D"),
+        text.str.startswith("QUESTION") | (text == "Q"),
+    ]
+    statuses = ["Healthy", "Out", "IR", "Doubtful", "Questionable"]
+    codes = [INJURY_STATUSES.index(s) for s in statuses]
+    return np.select(conditions, codes, default=INJURY_STATUSES.index("Other"))
+
+
+def injury_report(injuries):
+    """
+    Classify every row's status once and index the injured rows by team.
+    Statuses are classified per distinct value (there are only a handful),
+    then broadcast to rows through factorize codes.
+    """
+    columns = injuries.columns
+    status_col = next((c for c in columns if "status" in c or "injury" in c), None)
+    team_col = next((c for c in columns if "team" in c or "proteam" in c), None)
+
+    rows = injuries
+    if status_col:
+        codes, uniques = pd.factorize(injuries[status_col], use_na_sentinel=True)
+        classified = _classify_statuses(np.asarray(uniques, dtype=object))
+        # Missing statuses (-1) stay on the report as Other, as before
+        status = np.append(classified, INJURY_STATUSES.index("Other"))[codes]
+        healthy = status == INJURY_STATUSES.index("Healthy")
+        rows = injuries.iloc[np.flatnonzero(~healthy)].reset_index(drop=True)
+        rows["status_code"] = pd.Categorical.from_codes(status[~healthy], categories=INJURY_STATUSES, ordered=True)
+
+    teams, counts = {}, pd.Series(dtype="int64")
+    if team_col:
+        teams = rows.groupby(team_col, sort=True, observed=True).indices
+        counts = pd.Series({team: len(pos) for team, pos in teams.items()}, dtype="int64")
+        counts = counts.sort_values(ascending=False, kind="stable")
+    return InjuryReport(rows, teams, counts, team_col, status_col)
+
+
+# -----------------------------------
+# Transaction events
+# -----------------------------------
+# One player-level move per match in `details`: "Add: Player (RB), Drop: Player (WR)";
+# a move ends at a comma, a semicolon, the next "Action:" or the end of the text
+_EVENT_ACTIONS = "Add|Drop|Trade|Waiver|Claim"
+EVENT_PATTERN = (
+    rf"(?P<action>{_EVENT_ACTIONS})\s*:\s*(?P<player>[^,(]+?)\s*(?:\((?P<position>[^)]*)\))?"
+    rf"\s*(?=,|;|$|\b(?:{_EVENT_ACTIONS})\s*:)"
+)
+EVENT_COLUMNS = ["id", "time", "week", "team", "action", "player", "position", "details"]
+WEEK_COLUMNS = ("week", "scoring period", "scoringperiodid", "scoring_period")
+
+# events: one row per (transaction, player) move; teams/players: name -> row positions in events
+TransactionLog = namedtuple("TransactionLog", ["events", "teams", "players"])
+
+
+def _kickoff(year):
+    """Thursday after Labor Day (first Monday of September): the usual NFL week 1."""
+    september = pd.Timestamp(year=year, month=9, day=1)
+    labor_day = september + pd.Timedelta(days=(7 - september.dayofweek) % 7)
+    return labor_day + pd.Timedelta(days=3)
+
+
+def _event_times(column):
+    numeric = pd.to_numeric(column, errors="coerce")
+    if numeric.notna().all() and len(numeric):
+        return pd.to_datetime(numeric, unit="ms", errors="coerce")   # ESPN API epoch milliseconds
+    return pd.to_datetime(column, errors="coerce", format="mixed")
+
+
+def _event_weeks(transactions, times, season_start):
+    """Week from a week column, else days since `season_start` (or that season's kickoff); 0 is preseason."""
+    week_col = next((c for c in transactions.columns if c.lower() in WEEK_COLUMNS), None)
+    if week_col:
+        return pd.to_numeric(transactions[week_col], errors="coerce").astype("Int16")
+    if times.notna().sum() == 0:
+        return pd.Series(pd.NA, index=transactions.index, dtype="Int16")
+    start = pd.Timestamp(season_start) if season_start else _kickoff(times.min().year)
+    days = (times - start).dt.days
+    return (days // 7 + 1).clip(lower=0).astype("Int16")
+
+
+def transaction_events(transactions, season_start=None):
+    """
+    Parse every transaction's `details` into player-level events with one
+    vectorized str.extractall, and index them by team and by player. Lineup
+    moves and other rows without Add/Drop-style entries produce no events.
+    """
+    if transactions.empty or not {"details", "team"} <= set(transactions.columns):
+        events = pd.DataFrame(columns=EVENT_COLUMNS)
+        return TransactionLog(events, {}, {})
+
+    times = _event_times(transactions["time"]) if "time" in transactions.columns else pd.Series(pd.NaT, index=transactions.index)
+    weeks = _event_weeks(transactions, times, season_start)
+
+    matches = transactions["details"].reset_index(drop=True).str.extractall(EVENT_PATTERN, flags=re.IGNORECASE)
+    rows = matches.index.get_level_values(0).to_numpy()   # position of each event's transaction
+    events = pd.DataFrame({
+        "id": transactions["id"].array.take(rows) if "id" in transactions.columns else rows,
+        "time": times.array.take(rows),
+        "week": weeks.array.take(rows),
+        "team": pd.Categorical(transactions["team"].array.take(rows)),
+        "action": pd.Categorical(matches["action"].str.title().array),
+        "player": pd.Categorical(matches["player"].str.strip().array),
+        "position": pd.Categorical(matches["position"].array),
+        "details": transactions["details"].array.take(rows),   # the raw text, for checking the parse
+    })
+    events = events.sort_values(["time", "id"], kind="stable", na_position="last").reset_index(drop=True)
+
+    teams = events.groupby("team", sort=True, observed=True).indices
+    players = events.groupby("player", sort=True, observed=True).indices
+    return TransactionLog(events, teams, players)
@@ -1,5 +1,5 @@
 import streamlit as st
-from utils import load_all
+from utils import data_ready, get_data, get_refresher, league_selector
 
 st.set_page_config(
     page_title="Fantasy Football Dashboard",
@@ -9,10 +9,7 @@ st.set_page_config(
 
 st.sidebar.title("🏈 Fantasy Dashboard")
 st.sidebar.markdown("Use the sidebar to explore pages.")
-
-# Load the data once into session state
-if "data" not in st.session_state:
-    st.session_state["data"] = load_all()
+league = league_selector()
 
 st.title("🏟️ 11 Rookies, 1 Legend")
 st.markdown("""
@@ -20,3 +17,15 @@ st.markdown("""
 Navigate between Standings, All-Play Standings, Injuries, Power Rankings, Matchup Summary, and Transactions.
 Updates 4 Times a Day.
 """)
+
+# The landing page never waits on data: a cold start loads in the background
+# (kept current afterwards by the refresh worker) while this page is shown.
+if data_ready(league):
+    get_data(league)
+    timings = get_refresher(league).current().timings
+    if timings:
+        with st.sidebar.expander("⏱️ Data load timings"):
+            for name, secs in sorted(timings.items(), key=lambda kv: -kv[1]):
+                st.caption(f"{name}: {secs:.2f}s")
+else:
+    st.sidebar.caption("⏳ Loading league data…")
@@ -0,0 +1,145 @@
+"""
+Headless page benchmark.
+
+Runs app.py and every script in pages/ through Streamlit's AppTest against
+synthetic leagues and reports first-run latency, median rerun latency and
+peak Python memory per page. Each page's first run follows a fresh publish,
+so its derived tables compute as they would after a refresh; peak memory is
+traced over such a run. The playoff-odds prefetch that load_all() starts is
+waited for before each page and reported on its own (prefetch_mb).
+
+The tabs in leagues.COMPUTED_TABLES (All-Play; Power with
+FANTASY_POWER_ENGINE=1) are computed from matchups, as the app would, unless
+--sheet-tables is given. --played sets the completed weeks of the final
+season (0 = preseason, --weeks = regular season over). Run from the repo root:
+
+    python -m bench.run_pages --teams 12 32 --weeks 14 --seasons 1 3 --played 0 8 14
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from itertools import product
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# No network and no background refresh: the synthetic bundle is all there is
+os.environ.setdefault("FANTASY_REFRESH_SECONDS", "0")
+os.environ.setdefault("FANTASY_CACHE_DIR", tempfile.mkdtemp(prefix="fantasy-bench-"))
+sys.path.insert(0, str(ROOT))
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import utils  # noqa: E402
+from bench.synthetic import loaded_league  # noqa: E402
+
+
+def page_scripts():
+    return [ROOT / "app.py"] + sorted((ROOT / "pages").glob("*.py"))
+
+
+def publish_fresh(frames):
+    """
+    Publish `frames` as a new data version, so every derived table computes
+    again, and wait for the prefetches load_all() starts. Returns their peak
+    traced memory in bytes.
+    """
+    utils.get_refresher().publish({name: df.copy(deep=False) for name, df in frames.items()})
+    tracemalloc.start()
+    utils.load_all()
+    for thread in threading.enumerate():
+        if thread.name.startswith("derive-"):
+            thread.join()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def bench_page(script, frames, reruns, timeout):
+    prefetch = publish_fresh(frames)
+    at = AppTest.from_file(str(script), default_timeout=timeout)
+
+    start = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - start
+
+    times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+
+    # Separate first run so tracing overhead doesn't skew the timings above
+    publish_fresh(frames)
+    at = AppTest.from_file(str(script), default_timeout=timeout)
+    tracemalloc.start()
+    at.run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    errors = [str(e.value) for e in at.exception]
+    return {
+        "first_s": first,
+        "rerun_s": statistics.median(times) if times else first,
+        "peak_mb": peak / 2**20,
+        "prefetch_mb": prefetch / 2**20,
+        "errors": errors,
+    }
+
+
+def run(teams, weeks, seasons, reruns, timeout, seed, played=(None,), sheet_tables=False):
+    results = []
+    for n_teams, n_weeks, n_seasons, n_played in product(teams, weeks, seasons, played):
+        frames = loaded_league(
+            sheet_tables, teams=n_teams, weeks=n_weeks, seasons=n_seasons, played=n_played, seed=seed,
+        )
+        rows = sum(len(df) for df in frames.values())
+        for script in page_scripts():
+            result = bench_page(script, frames, reruns, timeout)
+            result.update(
+                page=script.name, teams=n_teams, weeks=n_weeks, seasons=n_seasons, played=n_played, rows=rows,
+            )
+            results.append(result)
+            print(
+                f"{script.name:32s} teams={n_teams:<4d} weeks={n_weeks:<3d} seasons={n_seasons:<2d} "
+                f"played={'-' if n_played is None else n_played:<3} "
+                f"first={result['first_s'] * 1000:8.1f}ms rerun={result['rerun_s'] * 1000:8.1f}ms "
+                f"peak={result['peak_mb']:7.1f}MB prefetch={result['prefetch_mb']:7.1f}MB"
+                + (f"  ERROR: {result['errors'][0][:80]}" if result["errors"] else ""),
+                flush=True,
+            )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, nargs="+", default=[12])
+    parser.add_argument("--weeks", type=int, nargs="+", default=[14])
+    parser.add_argument("--seasons", type=int, nargs="+", default=[1])
+    parser.add_argument("--played", type=int, nargs="+", default=[None],
+                        help="completed weeks in the final season (default: 60%% of --weeks)")
+    parser.add_argument("--sheet-tables", action="store_true",
+                        help="publish every sheet tab instead of computing leagues.COMPUTED_TABLES")
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    results = run(
+        args.teams, args.weeks, args.seasons, args.reruns, args.timeout, args.seed,
+        played=args.played, sheet_tables=args.sheet_tables,
+    )
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    return 1 if any(r["errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Cold-start report: import times and first paint.
+
+Every measurement runs in a fresh Python process, the way a new container
+would start:
+
+  * import time of each heavy library and of our own modules (cold, and on
+    top of what Streamlit itself already loads);
+  * first paint of app.py while the sheet server is slow to answer (the
+    landing page should not wait for it);
+  * first run of every page against a synthetic league, which includes the
+    libraries each page imports lazily.
+
+Run from the repo root:
+
+    python -m bench.startup --delay 2 --json startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = [
+    "streamlit",
+    "pandas",
+    "numpy",
+    "plotly.express",
+    "plotly.graph_objects",
+    "sklearn.cluster",
+    "utils",
+    "analytics",
+    "playoffs",
+    "clustering",
+    "figcache",
+]
+
+_IMPORT_SNIPPET = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+if {warm!r}:
+    import streamlit, pandas, numpy
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"ms": (time.perf_counter() - start) * 1000}}))
+"""
+
+
+def _child_env():
+    env = dict(os.environ)
+    env["FANTASY_REFRESH_SECONDS"] = "0"
+    env["FANTASY_CACHE_DIR"] = tempfile.mkdtemp(prefix="fantasy-startup-")
+    return env
+
+
+def _run_json(args, env=None, timeout=300):
+    out = subprocess.run(
+        [sys.executable, *args], cwd=ROOT, env=env or _child_env(),
+        capture_output=True, text=True, timeout=timeout,
+    )
+    lines = [line for line in out.stdout.splitlines() if line.startswith("{")]
+    if out.returncode or not lines:
+        raise RuntimeError(f"{args}: {out.stderr.strip()[-500:]}")
+    return json.loads(lines[-1])
+
+
+def import_times():
+    rows = []
+    for module in MODULES:
+        cold = _run_json(["-c", _IMPORT_SNIPPET.format(root=str(ROOT), warm=False, module=module)])["ms"]
+        warm = _run_json(["-c", _IMPORT_SNIPPET.format(root=str(ROOT), warm=True, module=module)])["ms"]
+        rows.append({"module": module, "cold_ms": cold, "after_streamlit_ms": warm})
+    return rows
+
+
+def _serve_slow(delay):
+    """Local CSV server for every source that answers after `delay` seconds; returns {name: url}."""
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from bench.synthetic import synthetic_league
+
+    bodies = {name: df.to_csv(index=False).encode("utf-8") for name, df in synthetic_league().items()}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            body = bodies.get(self.path.strip("/"), b"")
+            self.send_response(200 if body else 404)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return {name: f"http://127.0.0.1:{server.server_port}/{name}" for name in bodies}
+
+
+def _child(script, delay):
+    """Runs in the measured process: time imports and the first script run."""
+    start = time.perf_counter()
+    sys.path.insert(0, str(ROOT))
+    from streamlit.testing.v1 import AppTest
+
+    import utils
+    imported = time.perf_counter() - start
+
+    if Path(script).name == "app.py":
+        # Cold container: nothing cached, sheets slow to answer
+        urls = _serve_slow(delay)
+        utils.SOURCES.update({name: urls[name] for name in utils.SOURCES})
+    else:
+        from bench.synthetic import loaded_league
+        utils.get_refresher().publish(loaded_league())
+
+    at = AppTest.from_file(str(ROOT / script), default_timeout=max(60, delay * 10))
+    start = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - start
+    print(json.dumps({
+        "script": script,
+        "import_s": imported,
+        "first_paint_s": first,
+        "errors": [str(e.value) for e in at.exception],
+    }))
+
+
+def first_paint(delay):
+    scripts = ["app.py"] + [f"pages/{p.name}" for p in sorted((ROOT / "pages").glob("*.py"))]
+    return [
+        _run_json(["-m", "bench.startup", "--child", script, "--delay", str(delay)])
+        for script in scripts
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay", type=float, default=2.0, help="seconds the simulated sheet server takes to answer")
+    parser.add_argument("--json", help="also write results to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child(args.child, args.delay)
+        return 0
+
+    imports = import_times()
+    print(f"{'module':24s} {'cold':>10s} {'after st/pd/np':>16s}")
+    for row in imports:
+        print(f"{row['module']:24s} {row['cold_ms']:8.1f}ms {row['after_streamlit_ms']:14.1f}ms", flush=True)
+
+    print(f"\nfirst paint (fresh process; sheets answer after {args.delay:g}s for app.py)")
+    paints = first_paint(args.delay)
+    for row in paints:
+        print(
+            f"{row['script']:36s} imports={row['import_s'] * 1000:7.1f}ms "
+            f"first_paint={row['first_paint_s'] * 1000:8.1f}ms"
+            + (f"  ERROR: {row['errors'][0][:80]}" if row["errors"] else ""),
+            flush=True,
+        )
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"imports": imports, "first_paint": paints}, indent=2))
+    return 1 if any(row["errors"] for row in paints) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
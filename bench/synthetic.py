@@ -0,0 +1,154 @@
+"""
+Synthetic league generator for benchmarks.
+
+Produces all six sheet tabs with the same headers and text formatting the
+Google Sheets exports use, then types them through schema.apply_schema, so
+pages see exactly what a real load would hand them.
+"""
+import numpy as np
+import pandas as pd
+
+import leagues
+from schema import apply_schema
+
+POSITIONS = ["QB", "RB", "WR", "TE", "K", "D/ST"]
+STATUSES = ["ACTIVE", "ACTIVE", "ACTIVE", "QUESTIONABLE", "DOUBTFUL", "OUT", "INJURY_RESERVE"]
+
+
+def _schedule(rng, n_teams, weeks):
+    """Random round pairings; returns (week, team_idx, opp_idx) rows for both sides."""
+    rows = []
+    for week in range(1, weeks + 1):
+        order = rng.permutation(n_teams)
+        for a, b in zip(order[::2], order[1::2]):
+            rows.append((week, a, b))
+            rows.append((week, b, a))
+    return np.array(rows)
+
+
+def synthetic_league(teams=12, weeks=14, seasons=1, played=None, players_per_team=16, seed=0):
+    """
+    Return raw (all-text) frames keyed like utils.SOURCES.
+
+    `played` is the number of completed weeks in the final season (default: 60%
+    of `weeks`); earlier seasons are complete. Weeks run continuously across
+    seasons, with a `season` column for slicing.
+    """
+    rng = np.random.default_rng(seed)
+    teams += teams % 2
+    names = np.array([f"Team {i + 1:03d}" for i in range(teams)])
+    strength = rng.normal(110, 12, teams)
+    played = int(weeks * 0.6) if played is None else played
+
+    # --- matchups ---
+    frames = []
+    for s in range(seasons):
+        sched = _schedule(rng, teams, weeks)
+        pts = rng.normal(strength[sched[:, 1]], 22).round(2)
+        week = sched[:, 0] + s * weeks
+        future = (s == seasons - 1) & (sched[:, 0] > played)
+        frames.append(pd.DataFrame({
+            "season": 2025 - seasons + 1 + s,
+            "week": week,
+            "team": names[sched[:, 1]],
+            "opp": names[sched[:, 2]],
+            "pts": np.where(future, "", pts.astype(str)),
+        }))
+    matchups = pd.concat(frames, ignore_index=True)
+
+    done = matchups[matchups["pts"] != ""].astype({"pts": float})
+    opp_pts = done.merge(done, left_on=["week", "team"], right_on=["week", "opp"], suffixes=("", "_o"))["pts_o"]
+    wins = pd.Series((done["pts"].to_numpy() > opp_pts.to_numpy()), index=done["team"]).groupby(level=0).sum()
+    games = done.groupby("team").size()
+    pf = done.groupby("team")["pts"].sum()
+
+    # --- standings / allplay ---
+    win_pct = (wins / games).reindex(names).fillna(0)
+    standings = pd.DataFrame({
+        "Team": names,
+        "Wins": wins.reindex(names).fillna(0).astype(int).to_numpy(),
+        "Losses": (games - wins).reindex(names).fillna(0).astype(int).to_numpy(),
+        "Win%": win_pct.round(3).to_numpy(),
+    })
+    ap_wins = done.groupby("week")["pts"].rank(method="min").sub(1).groupby(done["team"]).sum()
+    ap_total = games * (teams - 1)
+    allplay = pd.DataFrame({
+        "team_id": np.arange(1, teams + 1),
+        "Team": names,
+        "Wins": ap_wins.reindex(names).fillna(0).astype(int).to_numpy(),
+        "Losses": (ap_total - ap_wins).reindex(names).fillna(0).astype(int).to_numpy(),
+    })
+    allplay["Win%"] = (allplay["Wins"] / (allplay["Wins"] + allplay["Losses"]).clip(lower=1)).round(3)
+
+    # --- power ---
+    ap_pct = allplay.set_index("Team")["Win%"]
+    power = pd.DataFrame({
+        "Team": names,
+        "PF": pf.reindex(names).fillna(0).round(1).to_numpy(),
+        "All-Play %": [f"{v * 100:.1f}%" for v in ap_pct.reindex(names)],
+        "Actual Win %": win_pct.round(3).to_numpy(),
+        "Avg Margin": rng.normal(0, 10, teams).round(1),
+        "Recent Form (3-wk avg)": rng.normal(strength, 8).round(1),
+        "Recent Margin (3-wk avg)": rng.normal(0, 12, teams).round(1),
+        "SoS Played": rng.normal(110, 4, teams).round(1),
+        "SoS Remaining": rng.normal(110, 4, teams).round(1),
+        "SoSΔvsAvg": rng.normal(0, 3, teams).round(1),
+        "Power Index": (strength - strength.mean()).round(2),
+    })
+    power.insert(0, "Rank", power["Power Index"].rank(ascending=False, method="first").astype(int))
+
+    # --- injuries ---
+    n_players = teams * players_per_team
+    injuries = pd.DataFrame({
+        "Player": [f"Player {i:05d}" for i in range(n_players)],
+        "Team": np.repeat(names, players_per_team),
+        "Position": rng.choice(POSITIONS, n_players),
+        "Status": rng.choice(STATUSES, n_players),
+    })
+
+    # --- transactions ---
+    n_tx = teams * weeks * seasons * 2
+    start = pd.Timestamp(f"{2025 - seasons + 1}-09-02")
+    when = start + pd.to_timedelta(np.sort(rng.uniform(0, weeks * 7 * seasons, n_tx)), unit="D")
+    add_pos, drop_pos = rng.choice(POSITIONS, n_tx), rng.choice(POSITIONS, n_tx)
+    details = np.where(
+        rng.random(n_tx) < 0.85,
+        [f"Add: Player {a:05d} ({p}), Drop: Player {d:05d} ({q})"
+         for a, d, p, q in zip(rng.integers(0, 99999, n_tx), rng.integers(0, 99999, n_tx), add_pos, drop_pos)],
+        "Lineup: 2 moves",
+    )
+    transactions = pd.DataFrame({
+        "id": np.arange(100000, 100000 + n_tx),
+        "type": np.where(rng.random(n_tx) < 0.8, "FREEAGENT", "WAIVER"),
+        "time": when.strftime("%Y-%m-%d %H:%M"),
+        "status": "EXECUTED",
+        "team": rng.choice(names, n_tx),
+        "details": details,
+    })
+
+    raw = {
+        "standings": standings,
+        "allplay": allplay,
+        "injuries": injuries,
+        "power": power,
+        "matchups": matchups,
+        "transactions": transactions,
+    }
+    return {name: df.astype(str) for name, df in raw.items()}
+
+
+def typed_league(**kwargs):
+    """synthetic_league() typed through the schema registry, as load_all() would serve it."""
+    return {name: apply_schema(name, df) for name, df in synthetic_league(**kwargs).items()}
+
+
+def loaded_league(sheet_tables=False, **kwargs):
+    """
+    typed_league() as the configured leagues load it: without the tabs in
+    leagues.COMPUTED_TABLES (All-Play by default), which pages compute from
+    matchups. `sheet_tables=True` keeps every tab.
+    """
+    frames = typed_league(**kwargs)
+    if sheet_tables:
+        return frames
+    return {name: df for name, df in frames.items() if name not in leagues.COMPUTED_TABLES}
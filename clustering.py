@@ -0,0 +1,102 @@
+"""
+K-means clustering of teams (or players) by a numeric feature matrix.
+
+Results are memoized on a hash of the matrix, so reruns and unchanged
+refreshes never refit. Labels are stable: cluster 0 is always the cluster
+whose centroid ranks highest on `order_by`, and a refit starts from the
+previous centroids for the same features, so colors don't shuffle. Inputs
+larger than MINIBATCH_ROWS use MiniBatchKMeans. scikit-learn is imported
+on the first fit, not with this module.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+MINIBATCH_ROWS = 5_000
+MEMO_SIZE = 16
+
+_memo = OrderedDict()   # (matrix hash, n_clusters, order_by) -> labels
+_centroids = {}         # (namespace, feature names, n_clusters) -> last fitted centroids (scaled space)
+_lock = threading.Lock()
+
+
+def _matrix_hash(values, columns):
+    h = hashlib.sha1(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    h.update(repr((values.shape, tuple(columns))).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _min_max(values):
+    lo, hi = values.min(axis=0), values.max(axis=0)
+    span = np.where(hi > lo, hi - lo, 1.0)
+    return (values - lo) / span
+
+
+def _fit(scaled, n_clusters, init):
+    # scikit-learn takes well over a second to import; only pay for it on a refit
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+
+    if len(scaled) > MINIBATCH_ROWS:
+        model = MiniBatchKMeans(
+            n_clusters=n_clusters,
+            init=init if init is not None else "k-means++",
+            n_init=1 if init is not None else 3,
+            batch_size=2048,
+            random_state=42,
+        )
+    else:
+        model = KMeans(
+            n_clusters=n_clusters,
+            init=init if init is not None else "k-means++",
+            n_init=1 if init is not None else 10,
+            random_state=42,
+        )
+    return model.fit(scaled)
+
+
+def cluster_labels(features, n_clusters=3, order_by=None, namespace=None):
+    """
+    Cluster the rows of `features` (a numeric DataFrame without NaNs) and
+    return an int array of labels, 0..n_clusters-1, numbered by descending
+    centroid `order_by` (default: the last column). Refits warm-start from
+    the last centroids fitted in the same `namespace`. The array is shared;
+    don't modify it.
+    """
+    columns = tuple(features.columns)
+    order_by = order_by or columns[-1]
+    values = features.to_numpy(dtype=np.float64)
+    n_clusters = min(n_clusters, len(values))
+    if n_clusters < 1:
+        return np.zeros(len(values), dtype=np.int64)
+
+    key = (_matrix_hash(values, columns), n_clusters, order_by)
+    with _lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key]
+        init = _centroids.get((namespace, columns, n_clusters))
+
+    model = _fit(_min_max(values), n_clusters, init)
+
+    # Renumber clusters by centroid strength so labels mean the same thing every fit
+    rank = np.argsort(-model.cluster_centers_[:, columns.index(order_by)], kind="stable")
+    relabel = np.empty(n_clusters, dtype=np.int64)
+    relabel[rank] = np.arange(n_clusters)
+    labels = relabel[model.labels_]
+    labels.setflags(write=False)
+
+    with _lock:
+        _centroids[(namespace, columns, n_clusters)] = model.cluster_centers_[rank]
+        _memo[key] = labels
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return labels
+
+
+def forget(namespace):
+    """Drop a namespace's warm-start centroids."""
+    with _lock:
+        for key in [k for k in _centroids if k[0] == namespace]:
+            del _centroids[key]
@@ -0,0 +1,88 @@
+"""
+Read-only data layer shared by every session.
+
+A DataView wraps one published data version. Indexing it hands out
+copy-on-write views of the frozen frames: a page can filter, sort or add
+columns to what it receives without touching what other pages and sessions
+see. Derived tables are built once per version through `derive()`.
+"""
+import threading
+from collections.abc import Mapping
+
+import pandas as pd
+
+# Views below rely on copy-on-write semantics (the default from pandas 3)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+def _view(obj):
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return obj.copy(deep=False)
+    if isinstance(obj, tuple) and not hasattr(obj, "_fields"):
+        return tuple(_view(o) for o in obj)
+    return obj
+
+
+def _nbytes(obj):
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, tuple):
+        return sum(_nbytes(o) for o in obj)
+    return getattr(obj, "nbytes", 0)
+
+
+class DataView(Mapping):
+    def __init__(self, frames, version=0, namespace=None):
+        self._frames = dict(frames)
+        self.version = version
+        self.namespace = namespace   # (league, season) this data belongs to
+        self._derived = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        return _view(self._frames[name])
+
+    def __iter__(self):
+        return iter(self._frames)
+
+    def __len__(self):
+        return len(self._frames)
+
+    @property
+    def cache_key(self):
+        """Identifies this data across leagues: (namespace, version)."""
+        return (self.namespace, self.version)
+
+    def nbytes(self):
+        """Approximate resident size of the frames and derived tables."""
+        return sum(_nbytes(obj) for obj in [*self._frames.values(), *self._derived.values()])
+
+    def derive(self, key, fn, *tables, **params):
+        """
+        Return fn(*frames_for(tables), **params), computed once per data version.
+        `fn` receives the frozen frames and must not modify them; the result is
+        shared, so callers get views of it as well.
+        """
+        memo_key = (key, tables, tuple(sorted(params.items())))
+        if memo_key not in self._derived:
+            # One lock per key: a slow derivation doesn't hold up the others
+            with self._lock:
+                key_lock = self._key_locks.setdefault(memo_key, threading.Lock())
+            with key_lock:
+                if memo_key not in self._derived:
+                    frames = [self._frames.get(t, pd.DataFrame()) for t in tables]
+                    self._derived[memo_key] = fn(*frames, **params)
+        return _view(self._derived[memo_key])
+
+    def prefetch(self, key, fn, *tables, **params):
+        """Start derive() on a background thread so the first page to ask doesn't pay for it."""
+        thread = threading.Thread(
+            target=self.derive, args=(key, fn, *tables), kwargs=params,
+            name=f"derive-{key}", daemon=True,
+        )
+        thread.start()
+        return thread
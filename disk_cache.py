@@ -0,0 +1,129 @@
+"""
+Persistent on-disk cache for the sheet CSV exports.
+
+Each URL gets a raw body file plus a small JSON sidecar holding its validators
+(ETag, Last-Modified and a SHA-256 of the body). Refetches are conditional
+requests, so a "304 Not Modified" skips the download, and an identical body
+skips the parse. The cache survives process restarts.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+import urllib.error
+import urllib.request
+from collections import namedtuple
+from pathlib import Path
+
+CACHE_DIR = Path(os.environ.get("FANTASY_CACHE_DIR", Path(__file__).resolve().parent / ".cache"))
+
+# status is one of "downloaded", "unchanged" (200 with identical body) or "not-modified" (304)
+Payload = namedtuple("Payload", ["body", "digest", "status"])
+
+log = logging.getLogger(__name__)
+
+# (url, parser) -> (digest, parsed object); only the latest payload per URL and parser is kept.
+# The same URL can be parsed several ways (raw strings vs typed), so the parser is part of the key.
+_parsed = {}
+
+
+def _paths(url):
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    root = Path(CACHE_DIR) / "http"
+    return root / f"{key}.body", root / f"{key}.json"
+
+
+def _read_meta(meta_path):
+    try:
+        return json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def fetch(url, timeout):
+    """Fetch `url` through the disk cache, revalidating with conditional headers."""
+    body_path, meta_path = _paths(url)
+    meta = _read_meta(meta_path) if body_path.exists() else {}
+
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout) as resp:
+            body = resp.read()
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+    except urllib.error.HTTPError as e:
+        if e.code != 304 or not meta:
+            raise
+        meta["checked_at"] = time.time()
+        _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+        return Payload(body_path.read_bytes(), meta["sha256"], "not-modified")
+
+    digest = hashlib.sha256(body).hexdigest()
+    status = "unchanged" if digest == meta.get("sha256") else "downloaded"
+    if status == "downloaded":
+        _write_atomic(body_path, body)
+    meta = {
+        "url": url,
+        "etag": etag,
+        "last_modified": last_modified,
+        "sha256": digest,
+        "checked_at": time.time(),
+    }
+    _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+    return Payload(body, digest, status)
+
+
+def fetch_parsed(url, timeout, parse):
+    """
+    Fetch `url` and return `parse(body)`, reusing the previous parse by the
+    same `parse` callable when the payload's digest hasn't changed. Callers
+    must treat the result as read-only.
+    """
+    payload = fetch(url, timeout)
+    cached = _parsed.get((url, parse))
+    if cached and cached[0] == payload.digest:
+        log.debug("%s: %s, reusing parsed frame", url, payload.status)
+        return cached[1]
+
+    parsed = parse(payload.body)
+    _parsed[(url, parse)] = (payload.digest, parsed)
+    log.debug("%s: %s, parsed %d bytes", url, payload.status, len(payload.body))
+    return parsed
+
+
+def read_parsed(url, parse):
+    """
+    Return `parse(body)` for the last cached payload of `url` without touching
+    the network, or None when nothing has been cached yet.
+    """
+    body_path, meta_path = _paths(url)
+    meta = _read_meta(meta_path)
+    if not meta.get("sha256") or not body_path.exists():
+        return None
+
+    cached = _parsed.get((url, parse))
+    if cached and cached[0] == meta["sha256"]:
+        return cached[1]
+    parsed = parse(body_path.read_bytes())
+    _parsed[(url, parse)] = (meta["sha256"], parsed)
+    return parsed
+
+
+def forget(urls):
+    """Drop the in-memory parses for `urls` (their files stay on disk)."""
+    urls = set(urls)
+    for key in [k for k in list(_parsed) if k[0] in urls]:
+        _parsed.pop(key, None)
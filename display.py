@@ -0,0 +1,96 @@
+"""
+Display columns and column configs for st.dataframe.
+
+Styler formats and colors in Python, one cell at a time, and ships every
+cell's CSS with the table. Here numbers stay numeric and st.column_config
+formats them in the browser; where a color carries meaning (up vs down) it
+becomes a marker column computed with np.select over the whole column.
+"""
+import numpy as np
+import streamlit as st
+
+from analytics import power_frame
+
+# Up, down, flat (or missing)
+TREND_MARKERS = ("🟢 ▲", "🔴 ▼", "⚪ –")
+
+
+def trend_markers(delta):
+    """Marker per value of `delta`: green up, red down, grey for zero or missing."""
+    values = np.asarray(delta, dtype=float)
+    return np.select([values > 0, values < 0], TREND_MARKERS[:2], default=TREND_MARKERS[2])
+
+
+# -----------------------------------
+# All-Play standings
+# -----------------------------------
+ALLPLAY_CONFIG = {
+    "Win%": st.column_config.NumberColumn(format="%.3f"),
+    "Δ Win%": st.column_config.NumberColumn(format="%+.3f", help="Change since the previous daily snapshot"),
+    "Trend": st.column_config.TextColumn(width="small"),
+}
+
+
+def allplay_table(merged):
+    """Team, record, Win%, Δ Win% and a trend marker, in display order."""
+    table = merged[[c for c in ["Team", "Wins", "Losses", "Ties", "Win%", "Δ Win%"] if c in merged.columns]]
+    return table.assign(Trend=trend_markers(table["Δ Win%"]))
+
+
+# -----------------------------------
+# Power rankings
+# -----------------------------------
+POWER_TABLE_COLUMNS = [
+    "Rank",
+    "Team",
+    "Power Index",
+    "All-Play %",
+    "Actual Win %",
+    "PF",
+    "Avg Margin",
+    "Recent Form (3-wk avg)",
+    "Recent Margin (3-wk avg)",
+    "SoS Played Rank",
+    "SoS Remaining Rank",
+    "SoS Δ vs Avg Rank",
+]
+
+POWER_CONFIG = {
+    "Power Index": st.column_config.NumberColumn(format="%.2f"),
+    "All-Play %": st.column_config.NumberColumn(format="%.1f%%"),
+    "Actual Win %": st.column_config.NumberColumn(format="%.1f%%"),
+    "PF": st.column_config.NumberColumn(format="%.0f"),
+    "Avg Margin": st.column_config.NumberColumn(format="%.1f"),
+    "Recent Form (3-wk avg)": st.column_config.NumberColumn(format="%.1f"),
+    "Recent Margin (3-wk avg)": st.column_config.NumberColumn(format="%.1f"),
+}
+
+
+def power_table(power):
+    """The Power Rankings table: numeric columns as-is (formatted by POWER_CONFIG), SoS as ranks."""
+    return power[[c for c in POWER_TABLE_COLUMNS if c in power.columns]]
+
+
+# -----------------------------------
+# Advanced Analytics
+# -----------------------------------
+CORRELATION_CONFIG = {
+    "Correlation with Power Index": st.column_config.ProgressColumn(
+        format="%.2f", min_value=-1.0, max_value=1.0, color="blue",
+    ),
+}
+
+LUCK_CONFIG = {
+    "All-Play %": st.column_config.NumberColumn(format="%.1f%%"),
+    "Actual Win %": st.column_config.NumberColumn(format="%.1f%%"),
+    "Luck Δ": st.column_config.NumberColumn(format="%+.1f"),
+    "Trend": st.column_config.TextColumn("", width="small"),
+}
+
+
+def luck_table(source, from_sheet=False):
+    """Teams from luckiest to unluckiest (actual minus all-play win %), with a marker."""
+    power, _ = power_frame(source, from_sheet)
+    table = power[["Team", "All-Play %", "Actual Win %", "Luck Δ"]].dropna(subset=["Actual Win %", "All-Play %"])
+    table = table.sort_values("Luck Δ", ascending=False, kind="stable").reset_index(drop=True)
+    return table.assign(Trend=trend_markers(table["Luck Δ"]))
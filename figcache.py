@@ -0,0 +1,89 @@
+"""
+Process-wide cache of built Plotly figures.
+
+    fig = figcache.figure("matchup:PF bar", data.cache_key, build_pf_bar)
+    st.plotly_chart(fig, use_container_width=True)
+
+Figures are keyed on (name, data version, params), so a rerun caused by an
+unrelated widget skips building them. Each entry keeps the serialized figure
+JSON (which is what the size bound counts) alongside the figure it came from;
+least recently used entries are evicted past FANTASY_FIGURE_CACHE_MB. Cached
+figures are shared by every session and must not be modified.
+
+Pages import plotly.express inside their build functions and chart sections
+rather than at the top: its first import costs about 90 ms, paid only on a
+cache miss. plotly.graph_objects is already loaded by `import streamlit`, so
+pages import it at the top like any other module.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+MAX_BYTES = int(float(os.environ.get("FANTASY_FIGURE_CACHE_MB", "64")) * 2**20)
+
+
+class FigureCache:
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # key -> (json, figure)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key, build):
+        """Return the figure for `key`, calling build() only on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        import plotly.io as pio
+
+        fig = build()
+        spec = pio.to_json(fig, validate=False)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (spec, fig)
+                self._bytes += len(spec)
+                while self._bytes > self.max_bytes and len(self._entries) > 1:
+                    _, (old_spec, _) = self._entries.popitem(last=False)
+                    self._bytes -= len(old_spec)
+        return fig
+
+    def forget(self, namespace):
+        """Drop every figure built for `namespace` (keys whose version is (namespace, ...))."""
+        with self._lock:
+            for key in [k for k in self._entries if isinstance(k[1], tuple) and k[1][:1] == (namespace,)]:
+                spec, _ = self._entries.pop(key)
+                self._bytes -= len(spec)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache = FigureCache()
+
+
+def figure(name, version, build, **params):
+    """
+    Cached `build()` for figure `name` at data `version` with `params`. Pass
+    DataView.cache_key as `version` so leagues never share figures.
+    """
+    return _cache.get((name, version, tuple(sorted(params.items()))), build)
+
+
+def forget(namespace):
+    """Drop a (league, season) namespace's figures."""
+    _cache.forget(namespace)
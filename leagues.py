@@ -0,0 +1,142 @@
+"""
+League and season registry.
+
+Every source URL, cache entry and derived table belongs to one (league,
+season) namespace. Leagues come from leagues.json (path overridable with
+FANTASY_LEAGUES); without one, the registry holds the single league whose
+sheet URLs used to be hardcoded in utils.py.
+
+    {
+      "leagues": [
+        {
+          "key": "rookies",
+          "name": "11 Rookies, 1 Legend",
+          "season": "2025",
+          "season_start": "2025-09-04",
+          "sheet": "<spreadsheet id>",
+          "gids": {"standings": "1760588931", "matchups": "1393390675", ...}
+        },
+        {
+          "key": "rookies", "season": "2024", "archived": true,
+          "sources": {"standings": "https://...", "matchups": "https://..."}
+        }
+      ]
+    }
+
+A league lists its tabs either as full CSV export URLs ("sources") or as a
+spreadsheet id plus tab gids. Archived seasons are loaded once and never
+refreshed in the background. `season_start` is the date of week 1, used to
+place timestamped events (transactions) into weeks.
+"""
+import json
+import os
+import re
+import urllib.parse
+from dataclasses import dataclass, field
+from pathlib import Path
+
+REGISTRY_PATH = Path(os.environ.get("FANTASY_LEAGUES", Path(__file__).resolve().parent / "leagues.json"))
+
+EXPORT_URL = "https://docs.google.com/spreadsheets/d/{sheet}/export?format=csv&gid={gid}"
+# Same tab through the Visualization API, which can skip rows already ingested
+QUERY_URL = "https://docs.google.com/spreadsheets/d/{sheet}/gviz/tq?tqx=out:csv&headers=1&gid={gid}&tq={query}"
+_EXPORT_RE = re.compile(r"docs\.google\.com/spreadsheets/d/(?P<sheet>[^/]+)/export\?(?:.*&)?gid=(?P<gid>\d+)")
+
+# The original league's spreadsheet (used when there is no leagues.json)
+DEFAULT_SHEET = "18JjC_OdQrs1uu4hrUdUTm_4CGhy3kPIm3EOPAC9b18U"
+DEFAULT_GIDS = {
+    "standings":    "1760588931",
+    "allplay":      "457551150",
+    "injuries":     "818211409",
+    "power":        "1068946133",
+    "matchups":     "1393390675",
+    "transactions": "622740068",
+}
+
+# All-Play is computed from matchups (analytics.py); FANTASY_ALLPLAY_SHEET=1 reads
+# the sheet's tab instead. Power Rankings come from the sheet's Power tab, and are
+# computed from matchups only without one (or for earlier weeks);
+# FANTASY_POWER_ENGINE=1 always computes them.
+COMPUTED_TABLES = tuple(
+    name for name, computed in (
+        ("allplay", os.environ.get("FANTASY_ALLPLAY_SHEET", "") in ("", "0")),
+        ("power", os.environ.get("FANTASY_POWER_ENGINE", "") not in ("", "0")),
+    )
+    if computed
+)
+
+
+@dataclass(frozen=True)
+class League:
+    key: str
+    season: str
+    name: str = ""
+    sources: dict = field(default_factory=dict, compare=False, hash=False)   # table -> CSV URL
+    season_start: str = None
+    archived: bool = False
+
+    @property
+    def namespace(self):
+        return (self.key, self.season)
+
+    @property
+    def label(self):
+        return f"{self.name or self.key} — {self.season}"
+
+
+def tail_url(url, offset):
+    """
+    URL for the rows of export `url` after the first `offset` data rows, or
+    None when `url` isn't a Google Sheets CSV export.
+    """
+    match = _EXPORT_RE.search(url)
+    if not match:
+        return None
+    query = urllib.parse.quote(f"select * offset {int(offset)}")
+    return QUERY_URL.format(sheet=match["sheet"], gid=match["gid"], query=query)
+
+
+def _sources(entry):
+    if "sources" in entry:
+        sources = dict(entry["sources"])
+    else:
+        sheet = entry["sheet"]
+        sources = {name: EXPORT_URL.format(sheet=sheet, gid=gid) for name, gid in entry.get("gids", {}).items()}
+    return {name: url for name, url in sources.items() if name not in COMPUTED_TABLES}
+
+
+def _league(entry):
+    return League(
+        key=str(entry["key"]),
+        season=str(entry.get("season", "")),
+        name=entry.get("name", ""),
+        sources=_sources(entry),
+        season_start=entry.get("season_start"),
+        archived=bool(entry.get("archived", False)),
+    )
+
+
+def load_registry(path=REGISTRY_PATH):
+    """{namespace: League} in file order; the built-in league when `path` doesn't exist."""
+    path = Path(path)
+    if path.exists():
+        entries = json.loads(path.read_text())["leagues"]
+    else:
+        entries = [{
+            "key": "rookies",
+            "name": "11 Rookies, 1 Legend",
+            "season": os.environ.get("FANTASY_SEASON", "current"),
+            "sheet": DEFAULT_SHEET,
+            "gids": DEFAULT_GIDS,
+        }]
+    leagues = [_league(entry) for entry in entries]
+    return {league.namespace: league for league in leagues}
+
+
+REGISTRY = load_registry()
+DEFAULT = next(iter(REGISTRY.values()))
+
+
+def get(namespace=None):
+    """The League for `namespace` ((key, season)), or the default league."""
+    return REGISTRY.get(tuple(namespace), DEFAULT) if namespace else DEFAULT
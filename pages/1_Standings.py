@@ -1,16 +1,17 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from utils import load_all
+import perf
+from playoffs import BYES, SIMULATIONS, playoff_odds
+from utils import get_data
 
 st.title("🏆 Standings & Playoff Bracket")
+perf.start_page("Standings")
 
 # === Load data ===
-if "data" not in st.session_state:
-    st.session_state["data"] = load_all()
-
-data = st.session_state["data"]
-standings = data["standings"]
+with perf.span("load"):
+    data = get_data()
+    standings = data["standings"]
 
 if standings.empty:
     st.warning("No standings data found.")
@@ -23,107 +24,153 @@ else:
         st.error("Couldn't identify team or win column. Please check your sheet headers.")
         st.dataframe(standings.head())
     else:
-        # --- Prepare data ---
-        standings[win_col] = pd.to_numeric(standings[win_col], errors="coerce")
-        standings = standings.sort_values(win_col, ascending=False).reset_index(drop=True)
-        standings["Rank"] = range(1, len(standings) + 1)
+        # --- Prepare data (columns arrive typed from schema.SCHEMAS) ---
+        with perf.span("compute"):
+            standings = standings.sort_values(win_col, ascending=False).reset_index(drop=True)
+            standings["Rank"] = range(1, len(standings) + 1)
+
+        # --- Live playoff odds (simulated once per data version; see playoffs.py) ---
+        with perf.span("compute:playoff odds"):
+            odds = data.derive("playoff_odds", playoff_odds, "matchups")
+            standings = standings.merge(
+                odds[["Team", "Playoffs", "Bye", "Champion"]].rename(columns={"Team": team_col}),
+                on=team_col,
+                how="left",
+            )
+            has_odds = standings["Champion"].notna().any()
 
         # === Vertical Bar Chart ===
-        colors = []
-        for r in standings["Rank"]:
-            if r <= 3:
-                colors.append("#1f77b4")   # Deep blue for playoff locks
-            elif r in [4, 5]:
-                colors.append("#66b3ff")   # Lighter blue for play-in
-            else:
-                colors.append("#2c2c2c")   # Dark gray for eliminated
+        with perf.span("render:record bar"):
+            colors = []
+            for r in standings["Rank"]:
+                if r <= 3:
+                    colors.append("#1f77b4")   # Deep blue for playoff locks
+                elif r in [4, 5]:
+                    colors.append("#66b3ff")   # Lighter blue for play-in
+                else:
+                    colors.append("#2c2c2c")   # Dark gray for eliminated
 
-        fig_chart = go.Figure(
-            go.Bar(
-                x=standings[team_col],
-                y=standings[win_col],
-                marker_color=colors,
-                text=standings[win_col],
-                textposition="outside",
-                textfont=dict(color="#f0f0f0"),
+            fig_chart = go.Figure(
+                go.Bar(
+                    x=standings[team_col],
+                    y=standings[win_col],
+                    marker_color=colors,
+                    text=standings[win_col],
+                    textposition="outside",
+                    textfont=dict(color="#f0f0f0"),
+                    customdata=standings[["Playoffs", "Bye", "Champion"]].fillna(0).to_numpy(),
+                    hovertemplate=(
+                        "<b>%{x}</b><br>"
+                        + f"{win_col}: " + "%{y}<br>"
+                        + "Playoffs: %{customdata[0]:.1%}<br>"
+                        + "Bye: %{customdata[1]:.1%}<br>"
+                        + "Champion: %{customdata[2]:.1%}<extra></extra>"
+                    ) if has_odds else None,
+                )
             )
-        )
 
-        # Add playoff cutoff marker (between 5th and 6th)
-        cutoff_y = standings.loc[5, win_col] - 0.05 if len(standings) > 5 else None
-        if cutoff_y:
-            fig_chart.add_hline(
-                y=cutoff_y,
-                line_dash="dash",
-                line_color="#ff9f43",  # gold accent
-                annotation_text="Playoff Cutoff",
-                annotation_position="top right",
-                annotation_font_color="#ff9f43",
-            )
+            # Add playoff cutoff marker (between 5th and 6th)
+            cutoff_y = standings.loc[5, win_col] - 0.05 if len(standings) > 5 else None
+            if cutoff_y:
+                fig_chart.add_hline(
+                    y=cutoff_y,
+                    line_dash="dash",
+                    line_color="#ff9f43",  # gold accent
+                    annotation_text="Playoff Cutoff",
+                    annotation_position="top right",
+                    annotation_font_color="#ff9f43",
+                )
 
-        fig_chart.update_layout(
-            title="📈 Team Performance by Record",
-            xaxis_title="Team",
-            yaxis_title=win_col,
-            height=450,
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            font=dict(color="#f0f0f0"),
-            margin=dict(t=40, b=40, l=40, r=20),
-        )
-        st.plotly_chart(fig_chart, use_container_width=True)
+            fig_chart.update_layout(
+                title="📈 Team Performance by Record",
+                xaxis_title="Team",
+                yaxis_title=win_col,
+                height=450,
+                plot_bgcolor="rgba(0,0,0,0)",
+                paper_bgcolor="rgba(0,0,0,0)",
+                font=dict(color="#f0f0f0"),
+                margin=dict(t=40, b=40, l=40, r=20),
+            )
+            st.plotly_chart(fig_chart, use_container_width=True)
 
         # === Playoff Bracket ===
-        top5 = standings.head(5)
-        team_names = top5[team_col].tolist()
+        with perf.span("render:bracket"):
+            top5 = standings.head(5)
+            team_names = top5[team_col].tolist()
+            if has_odds:
+                # Current seed plus simulated title odds
+                team_names = [
+                    f"{name} ({champ:.0%} 🏆)" if pd.notna(champ) else name
+                    for name, champ in zip(team_names, top5["Champion"])
+                ]
 
-        if len(team_names) < 5:
-            st.warning("Need at least 5 teams to draw the playoff bracket.")
-        else:
-            fig = go.Figure()
-            nodes = {
-                "4": (0, 3), "5": (0, 1),
-                "1": (2, 4), "2": (2, 2), "3": (2, 0),
-                "F1": (4, 3), "F2": (4, 1),
-                "W": (6, 2),
-            }
-            labels = {
-                "4": f"4️⃣ {team_names[3]}",
-                "5": f"5️⃣ {team_names[4]}",
-                "1": f"1️⃣ {team_names[0]}",
-                "2": f"2️⃣ {team_names[1]}",
-                "3": f"3️⃣ {team_names[2]}",
-                "F1": "🏆 Winner of 1 vs (4/5)",
-                "F2": "🏆 Winner of 2 vs 3",
-                "W": "🏆 Champion",
-            }
+            if len(team_names) < 5:
+                st.warning("Need at least 5 teams to draw the playoff bracket.")
+            else:
+                fig = go.Figure()
+                nodes = {
+                    "4": (0, 3), "5": (0, 1),
+                    "1": (2, 4), "2": (2, 2), "3": (2, 0),
+                    "F1": (4, 3), "F2": (4, 1),
+                    "W": (6, 2),
+                }
+                labels = {
+                    "4": f"4️⃣ {team_names[3]}",
+                    "5": f"5️⃣ {team_names[4]}",
+                    "1": f"1️⃣ {team_names[0]}",
+                    "2": f"2️⃣ {team_names[1]}",
+                    "3": f"3️⃣ {team_names[2]}",
+                    "F1": "🏆 Winner of 1 vs (4/5)",
+                    "F2": "🏆 Winner of 2 vs 3",
+                    "W": "🏆 Champion",
+                }
 
-            for key, (x, y) in nodes.items():
-                fig.add_trace(
-                    go.Scatter(
-                        x=[x],
-                        y=[y],
-                        mode="text",
-                        text=[labels[key]],
-                        textfont=dict(size=16, color="#f0f0f0"),
-                        hoverinfo="none",
+                for key, (x, y) in nodes.items():
+                    fig.add_trace(
+                        go.Scatter(
+                            x=[x],
+                            y=[y],
+                            mode="text",
+                            text=[labels[key]],
+                            textfont=dict(size=16, color="#f0f0f0"),
+                            hoverinfo="none",
+                        )
                     )
+
+                fig.update_layout(
+                    title="🏈 Fantasy Playoff Bracket (Top 5 Teams)",
+                    xaxis=dict(visible=False),
+                    yaxis=dict(visible=False),
+                    showlegend=False,
+                    height=400,
+                    plot_bgcolor="rgba(0,0,0,0)",
+                    paper_bgcolor="rgba(0,0,0,0)",
+                    font=dict(color="#f0f0f0"),
+                    margin=dict(t=40, b=20, l=20, r=20),
+                    annotations=[
+                        dict(x=0, y=4.2, text="Week 15 – Play-In", showarrow=False, font=dict(size=10, color="gray")),
+                        dict(x=2, y=4.6, text="Week 16 – Semifinals", showarrow=False, font=dict(size=10, color="gray")),
+                        dict(x=4, y=4.2, text="Week 17 – Championship", showarrow=False, font=dict(size=10, color="gray")),
+                    ],
                 )
+                st.plotly_chart(fig, use_container_width=True)
 
-            fig.update_layout(
-                title="🏈 Fantasy Playoff Bracket (Top 5 Teams)",
-                xaxis=dict(visible=False),
-                yaxis=dict(visible=False),
-                showlegend=False,
-                height=400,
-                plot_bgcolor="rgba(0,0,0,0)",
-                paper_bgcolor="rgba(0,0,0,0)",
-                font=dict(color="#f0f0f0"),
-                margin=dict(t=40, b=20, l=20, r=20),
-                annotations=[
-                    dict(x=0, y=4.2, text="Week 15 – Play-In", showarrow=False, font=dict(size=10, color="gray")),
-                    dict(x=2, y=4.6, text="Week 16 – Semifinals", showarrow=False, font=dict(size=10, color="gray")),
-                    dict(x=4, y=4.2, text="Week 17 – Championship", showarrow=False, font=dict(size=10, color="gray")),
-                ],
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        # === Playoff Odds Table ===
+        if has_odds:
+            with st.expander("🎲 Playoff Odds (Monte Carlo)"):
+                with perf.span("render:odds table"):
+                    odds_display = odds.copy(deep=False)
+                    pct_cols = [c for c in odds_display.columns if c not in ("Team", "Proj Wins")]
+                    odds_display[pct_cols] = odds_display[pct_cols] * 100
+                    st.dataframe(
+                        odds_display,
+                        use_container_width=True,
+                        hide_index=True,
+                        column_config={c: st.column_config.NumberColumn(format="%.1f%%") for c in pct_cols},
+                    )
+                    st.caption(
+                        f"Rest of the regular season simulated {SIMULATIONS:,} times from each team's "
+                        f"scoring so far; seeds 1–{BYES} get a bye past the play-in."
+                    )
+
+perf.debug_panel()
@@ -1,66 +1,72 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 from datetime import datetime
+import perf
+from analytics import allplay_standings, allplay_weekly
+from display import ALLPLAY_CONFIG, allplay_table
+from store import previous_allplay
+from utils import get_data
 
 # -----------------------------------
 # Page Setup
 # -----------------------------------
 st.set_page_config(page_title="All-Play Standings", layout="wide")
 st.title("🏈 All-Play Standings")
+perf.start_page("All-Play Standings")
 
 # -----------------------------------
 # Load Data
 # -----------------------------------
-data = st.session_state.get("data", {})
-allplay = data.get("allplay", pd.DataFrame())
+with perf.span("load"):
+    data = get_data()
+    allplay = data.get("allplay", pd.DataFrame())
+
+# The All-Play tab is optional: without it, compute the table from matchup scores
+if allplay.empty:
+    with perf.span("compute:allplay"):
+        allplay = data.derive("allplay", allplay_standings, "matchups")
+        weekly = data.derive("allplay_weekly", allplay_weekly, "matchups")
+else:
+    weekly = pd.DataFrame()
 
 if allplay.empty:
     st.info("No All-Play data available.")
     st.stop()
 
 # -----------------------------------
-# Normalize and Validate
+# Validate (headers and Win% are typed at load time)
 # -----------------------------------
-allplay.columns = allplay.columns.str.strip()
 if "Win%" not in allplay.columns:
     st.error("Missing 'Win%' column in data.")
     st.stop()
 
-# Ensure numeric Win%
-allplay["Win%"] = pd.to_numeric(allplay["Win%"], errors="coerce")
-allplay = allplay.dropna(subset=["Team", "Win%"])
-allplay = allplay.sort_values("Win%", ascending=False).reset_index(drop=True)
+with perf.span("normalize"):
+    allplay = allplay.dropna(subset=["Team", "Win%"])
+    allplay = allplay.sort_values("Win%", ascending=False).reset_index(drop=True)
 
 # -----------------------------------
 # Daily Snapshot Tracking
 # -----------------------------------
-today = datetime.now().strftime("%Y-%m-%d")
-st.session_state.setdefault("allplay_history", {})
-
-if today not in st.session_state["allplay_history"]:
-    st.session_state["allplay_history"][today] = allplay.copy()
-    st.toast(f"📊 Saved daily snapshot for {today}", icon="✅")
-
-history = st.session_state["allplay_history"]
-merged = allplay.copy()
-
-if len(history) >= 2:
-    dates = sorted(history.keys())
-    prev_day = dates[-2]
-    prev_df = history[prev_day]
-    merged = pd.merge(
-        allplay,
-        prev_df[["team_id", "Win%"]],
-        on="team_id",
-        how="left",
-        suffixes=("", "_prev")
-    )
-    merged["Δ Win%"] = merged["Win%"] - merged["Win%_prev"]
-    trend_available = True
-else:
-    merged["Δ Win%"] = 0.0
-    trend_available = False
+# Snapshots are written once per fetch by fetch_all() into the shared store;
+# the trend compares against the most recent earlier day (read once per data
+# version and date).
+with perf.span("compute:trend"):
+    today = datetime.now().strftime("%Y-%m-%d")
+    prev_df = data.derive("previous_allplay", previous_allplay, before_date=today, namespace=data.namespace)
+    merged = allplay.copy(deep=False)
+
+    if not prev_df.empty:
+        merged = pd.merge(
+            allplay.assign(team_id=allplay["team_id"].astype(str)),
+            prev_df[["team_id", "Win%_prev"]],
+            on="team_id",
+            how="left",
+        )
+        merged["Δ Win%"] = merged["Win%"] - merged["Win%_prev"]
+        trend_available = True
+    else:
+        merged["Δ Win%"] = 0.0
+        trend_available = False
 
 # -----------------------------------
 # Expandable Insights Section
@@ -100,45 +106,61 @@ if not merged.empty:
 # -----------------------------------
 st.subheader("📈 All-Play Win Percentage")
 
-fig = px.bar(
-    merged,
-    x="Team",
-    y="Win%",
-    color="Win%",
-    color_continuous_scale=px.colors.sequential.Blues_r,
-    title="Cumulative All-Play Win Percentage",
-)
-
-fig.update_traces(hovertemplate="<b>%{x}</b><br>Win%: %{y:.3f}<extra></extra>")
-fig.update_layout(
-    plot_bgcolor="rgba(0,0,0,0)",
-    paper_bgcolor="rgba(0,0,0,0)",
-    font=dict(color="#f0f0f0"),
-    xaxis_title=None,
-    yaxis_title="Win %",
-    coloraxis_showscale=False,
-    margin=dict(t=60, b=20),
-)
-st.plotly_chart(fig, use_container_width=True)
+with perf.span("render:win% bar"):
+    import plotly.express as px
+    fig = px.bar(
+        merged,
+        x="Team",
+        y="Win%",
+        color="Win%",
+        color_continuous_scale=px.colors.sequential.Blues_r,
+        title="Cumulative All-Play Win Percentage",
+    )
+
+    fig.update_traces(hovertemplate="<b>%{x}</b><br>Win%: %{y:.3f}<extra></extra>")
+    fig.update_layout(
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        font=dict(color="#f0f0f0"),
+        xaxis_title=None,
+        yaxis_title="Win %",
+        coloraxis_showscale=False,
+        margin=dict(t=60, b=20),
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+# -----------------------------------
+# Weekly Trend (computed engine only)
+# -----------------------------------
+if not weekly.empty:
+    with st.expander("📉 All-Play Win% by Week"):
+        with perf.span("render:weekly trend"):
+            import plotly.express as px
+            trend_df = weekly if "season" not in weekly.columns else weekly[weekly["season"] == weekly["season"].max()]
+            fig = px.line(trend_df, x="week", y="Win%", color="team", markers=True)
+            fig.update_layout(
+                plot_bgcolor="rgba(0,0,0,0)",
+                paper_bgcolor="rgba(0,0,0,0)",
+                font=dict(color="#f0f0f0"),
+                xaxis_title="Week",
+                yaxis_title="Cumulative Win %",
+                legend_title=None,
+            )
+            st.plotly_chart(fig, use_container_width=True)
 
 # -----------------------------------
 # Detailed Table
 # -----------------------------------
 st.subheader("📋 Detailed Standings")
 
-def style_delta(val):
-    color = "#2ecc71" if val > 0 else "#e74c3c" if val < 0 else "#999"
-    return f"color:{color}; font-weight:600"
-
-merged = merged[["Team", "Wins", "Losses", "Win%", "Δ Win%"]]
-styled = (
-    merged.style.format({"Win%": "{:.3f}", "Δ Win%": "{:+.3f}"})
-    .applymap(style_delta, subset=["Δ Win%"])
-)
-st.dataframe(styled, use_container_width=True, hide_index=True)
+with perf.span("render:table"):
+    # Formatting by column config; the Δ colors are a precomputed marker column
+    st.dataframe(allplay_table(merged), use_container_width=True, hide_index=True, column_config=ALLPLAY_CONFIG)
 
 # -----------------------------------
 # Footer
 # -----------------------------------
 status = "trend active" if trend_available else "first day recorded"
 st.caption(f"🕒 Updated {datetime.now():%b %d, %Y %I:%M %p} — {status}.")
+
+perf.debug_panel()
@@ -1,25 +1,26 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import figcache
+import perf
+from analytics import injury_report
+from tables import paged_table
+from utils import get_data
 
 st.title("🚑 Injury Report")
+perf.start_page("Injuries")
 
-data = st.session_state.get("data", {})
-injuries = data.get("injuries", pd.DataFrame())
+with perf.span("load"):
+    data = get_data()
+    injuries = data.get("injuries", pd.DataFrame())
 
 if injuries.empty:
     st.info("No injury data available.")
 else:
-    # === Normalize column names ===
-    injuries.columns = injuries.columns.str.strip().str.lower()
-
-    # === Identify key columns ===
-    status_col = next((c for c in injuries.columns if "status" in c or "injury" in c), None)
-    team_col = next((c for c in injuries.columns if "team" in c or "proteam" in c), None)
-
-    # === Filter out healthy players ===
-    if status_col:
-        injuries = injuries[~injuries[status_col].str.contains("active|healthy|none", case=False, na=False)]
+    # Statuses are classified and rows indexed by team once per data version
+    with perf.span("compute:classify"):
+        report = data.derive("injury_report", injury_report, "injuries")
+    team_col = report.team_col
+    injuries = report.rows
 
     if injuries.empty:
         st.success("✅ No current injuries — everyone’s healthy!")
@@ -27,29 +28,39 @@ else:
         # === Sidebar Filters ===
         st.sidebar.header("Filters")
 
+        selected_team = "All Teams"
+        team_counts = report.counts
         if team_col:
-            teams = sorted(injuries[team_col].dropna().unique())
-            selected_team = st.sidebar.selectbox("Filter by Team", ["All Teams"] + teams)
+            selected_team = st.sidebar.selectbox("Filter by Team", ["All Teams"] + list(report.teams))
             if selected_team != "All Teams":
-                injuries = injuries[injuries[team_col] == selected_team]
+                injuries = injuries.take(report.teams[selected_team])
+                team_counts = team_counts.loc[[selected_team]]
 
         # === KPI Metrics ===
         total_injured = len(injuries)
-        total_teams = injuries[team_col].nunique() if team_col else 0
+        total_teams = len(team_counts)
+        out_or_ir = int(injuries["status_code"].isin(["Out", "IR"]).sum()) if "status_code" in injuries else None
 
-        c1, c2 = st.columns(2)
+        c1, c2, c3 = st.columns(3)
         c1.metric("Total Injured", total_injured)
         c2.metric("Teams Impacted", total_teams)
+        if out_or_ir is not None:
+            c3.metric("Out / IR", out_or_ir)
         st.caption(f"🕒 Updated: {pd.Timestamp.now():%b %d, %Y %I:%M %p}")
 
         # === Injury Table (Expandable) ===
         with st.expander("🩹 View Injury List"):
-            st.dataframe(injuries, use_container_width=True)
+            paged_table(
+                injuries,
+                "injuries",
+                version=(data.cache_key, selected_team),
+                default_sort="status_code" if "status_code" in injuries else None,
+                search_columns=[c for c in injuries.columns if c not in (team_col, "status_code")],
+            )
 
         # === Charts: Both by Team ===
         if team_col:
-            team_counts = injuries[team_col].value_counts().reset_index()
-            team_counts.columns = ["Team", "Injured Players"]
+            team_counts = team_counts.rename_axis("Team").reset_index(name="Injured Players")
 
             # --- Top Injured Team Callout ---
             top_team, top_count = team_counts.iloc[0]
@@ -64,14 +75,13 @@ else:
                 unsafe_allow_html=True
             )
 
-            col1, col2 = st.columns(2)
-
-            # --- Radar Chart: Injuries by Team ---
-            with col1:
+            # Figures are cached per data version and team filter (figcache.py)
+            def build_radar():
+                import plotly.express as px
                 # use same palette as bar
                 blues_palette = px.colors.sequential.Blues_r
                 main_color = blues_palette[2]  # mid-tone blue
-            
+
                 # convert to RGBA safely
                 if main_color.startswith("#"):
                     r = int(main_color[1:3], 16)
@@ -83,9 +93,9 @@ else:
                 else:
                     # fallback: default blue tone
                     r, g, b = (30, 144, 255)
-            
+
                 fill_rgba = f"rgba({r},{g},{b},0.5)"
-            
+
                 fig_radar = px.line_polar(
                     team_counts,
                     r="Injured Players",
@@ -110,11 +120,10 @@ else:
                     font=dict(color="#f0f0f0"),
                     margin=dict(t=60, b=20),
                 )
-                st.plotly_chart(fig_radar, use_container_width=True)
-
+                return fig_radar
 
-            # --- Bar Chart: Injuries by Team ---
-            with col2:
+            def build_bar():
+                import plotly.express as px
                 fig_bar = px.bar(
                     team_counts,
                     x="Team",
@@ -134,4 +143,20 @@ else:
                     coloraxis_showscale=False,
                     margin=dict(t=60, b=20),
                 )
-                st.plotly_chart(fig_bar, use_container_width=True)
+                return fig_bar
+
+            col1, col2 = st.columns(2)
+
+            # --- Radar Chart: Injuries by Team ---
+            with col1:
+                with perf.span("render:radar"):
+                    fig_radar = figcache.figure("injuries:radar", data.cache_key, build_radar, team=selected_team)
+                    st.plotly_chart(fig_radar, use_container_width=True)
+
+            # --- Bar Chart: Injuries by Team ---
+            with col2:
+                with perf.span("render:bar"):
+                    fig_bar = figcache.figure("injuries:bar", data.cache_key, build_bar, team=selected_team)
+                    st.plotly_chart(fig_bar, use_container_width=True)
+
+perf.debug_panel()
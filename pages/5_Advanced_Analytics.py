@@ -1,108 +1,55 @@
-import re
-import numpy as np
 import pandas as pd
-import streamlit as st
-import plotly.express as px
 import plotly.graph_objects as go
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.cluster import KMeans
-from utils import load_all
+import streamlit as st
+from clustering import cluster_labels
+import figcache
+import perf
+from utils import fragment, get_data
+from analytics import power_correlation, power_frame, power_metric_matrix
+from display import CORRELATION_CONFIG, LUCK_CONFIG, luck_table
 
 # -----------------------------------
 # Page Setup
 # -----------------------------------
 st.set_page_config(page_title="Advanced Power Analytics", layout="wide")
 st.title("🔍 Advanced Power Analytics")
+perf.start_page("Advanced Analytics")
 
 # -----------------------------------
 # Load Data
 # -----------------------------------
-if "data" not in st.session_state:
-    st.session_state["data"] = load_all()
-
-data = st.session_state["data"]
-power = data.get("power", pd.DataFrame())
+with perf.span("load"):
+    data = get_data()
+    power = data.get("power", pd.DataFrame())
+    matchups = data.get("matchups", pd.DataFrame())
 
-if power.empty:
+if power.empty and matchups.empty:
     st.warning("No power ranking data found.")
     st.stop()
 
 # -----------------------------------
-# Normalize Columns
+# Normalize (shared with the other power page, once per data version).
+# Without the sheet's Power tab the table is computed from matchups.
 # -----------------------------------
-power.columns = (
-    power.columns.astype(str)
-    .str.strip()
-    .str.replace(r"\s+", " ", regex=True)
-    .str.replace("\u00a0", " ", regex=False)
-    .str.replace("\ufeff", "", regex=False)
-)
-rename_map = {
-    "Actual Win": "Actual Win %",
-    "Actual Win%": "Actual Win %",
-    "Actual Win Percentage": "Actual Win %",
-}
-power.rename(columns=rename_map, inplace=True)
-
-expected_cols = [
-    "Rank",
-    "Team",
-    "PF",
-    "All-Play %",
-    "Actual Win %",
-    "Avg Margin",
-    "Recent Form (3-wk avg)",
-    "Recent Margin (3-wk avg)",
-    "SoS Played",
-    "SoS Remaining",
-    "SoS Δ vs Avg",
-    "Power Index",
-]
-missing = [c for c in expected_cols if c not in power.columns]
+power_from_sheet = not power.empty
+power_source = "power" if power_from_sheet else "matchups"
+with perf.span("compute:power"):
+    # Same derive key as the Power Rankings page, so the table is built once per version
+    power, missing = data.derive(
+        "power_frame", power_frame, power_source, from_sheet=power_from_sheet, through_week=None,
+    )
 if missing:
     st.error(f"Missing columns: {', '.join(missing)}")
     st.dataframe(power.head())
     st.stop()
+if power.empty:
+    st.info("No completed weeks yet.")
+    st.stop()
 
-# -----------------------------------
-# Cleaning helpers
-# -----------------------------------
-def clean_percent(series):
-    def to_float(x):
-        if pd.isna(x):
-            return None
-        x = re.sub(r"[^0-9.\-]", "", str(x))
-        try:
-            val = float(x)
-            return val * 100 if 0 <= val <= 1 else val
-        except ValueError:
-            return None
-    return pd.Series([to_float(v) for v in series], dtype="float")
-
-for col in ["All-Play %", "Actual Win %"]:
-    power[col] = clean_percent(power[col])
-
-numeric_cols = [
-    "PF",
-    "Avg Margin",
-    "Recent Form (3-wk avg)",
-    "Recent Margin (3-wk avg)",
-    "SoS Played",
-    "SoS Remaining",
-    "SoS Δ vs Avg",
-    "Power Index",
-    "Rank",
-]
-for col in numeric_cols:
-    power[col] = pd.to_numeric(power[col], errors="coerce")
-
-power.sort_values("Rank", inplace=True)
-power.reset_index(drop=True, inplace=True)
-
-# -----------------------------------
-# 📊 Metric Correlation Explorer
-# -----------------------------------
-st.subheader("📊 Metric Correlation Explorer")
+# Each section below is a fragment: its widgets rerun only that section. Inputs
+# come from tables derived once per data version (keyed on the table `power`
+# was built from) or from the figure/cluster caches. plotly.express is imported
+# inside the sections that draw, scikit-learn inside clustering.py on a cache miss.
 
 # Metrics to analyze (excluding Power Index)
 metrics = [
@@ -117,220 +64,256 @@ metrics = [
     "PF",
 ]
 
-selected_metrics = st.multiselect(
-    "Select metrics to analyze correlation with Power Index",
-    metrics,
-    default=metrics,  # Default = all metrics (excluding Power Index)
-)
-
-if selected_metrics:
-    corr_df = (
-        power[selected_metrics + ["Power Index"]]
-        .corr(numeric_only=True)["Power Index"]
-        .drop("Power Index")
-        .sort_values(ascending=False)
-        .to_frame("Correlation with Power Index")
-    )
 
-    st.dataframe(
-        corr_df.style.format("{:.2f}").background_gradient(cmap="Blues"),
-        use_container_width=True,
+# -----------------------------------
+# 📊 Metric Correlation Explorer
+# -----------------------------------
+@fragment
+def correlation_section():
+    st.subheader("📊 Metric Correlation Explorer")
+
+    selected_metrics = st.multiselect(
+        "Select metrics to analyze correlation with Power Index",
+        metrics,
+        default=metrics,  # Default = all metrics (excluding Power Index)
     )
-else:
-    st.info("Select at least one metric to view correlation with Power Index.")
+
+    # Pairwise correlations, so any selection is a subset of the full series
+    with perf.span("compute:correlation"):
+        corr = data.derive(
+            "power_correlation",
+            power_correlation,
+            power_source,
+            from_sheet=power_from_sheet,
+            metrics=tuple(metrics),
+        )
+
+    with perf.span("render:correlation"):
+        if selected_metrics:
+            corr_df = corr[selected_metrics].sort_values(ascending=False).to_frame("Correlation with Power Index")
+
+            st.dataframe(corr_df, use_container_width=True, column_config=CORRELATION_CONFIG)
+        else:
+            st.info("Select at least one metric to view correlation with Power Index.")
 
 
 # -----------------------------------
 # 🍀 Luck Index — Actual Win % vs All-Play %
 # -----------------------------------
-st.subheader("🍀 Luck Index vs Actual Results")
-
-luck_df = power.dropna(subset=["Actual Win %", "All-Play %"]).copy()
-luck_df["Luck Δ"] = luck_df["Actual Win %"] - luck_df["All-Play %"]
-
-if not luck_df.empty:
-    col1, col2 = st.columns([3, 2])
-    with col1:
-        fig = px.scatter(
-            luck_df,
-            x="All-Play %",
-            y="Actual Win %",
-            color="Luck Δ",
-            color_continuous_scale="Blues_r",
-            hover_data={
-                "Team": True,
-                "All-Play %": ":.1f",
-                "Actual Win %": ":.1f",
-                "Luck Δ": ":.1f",
-            },
-            title="Luck vs Performance Scatter",
-        )
-        fig.add_shape(
-            type="line",
-            x0=luck_df["All-Play %"].min(),
-            y0=luck_df["All-Play %"].min(),
-            x1=luck_df["All-Play %"].max(),
-            y1=luck_df["All-Play %"].max(),
-            line=dict(color="gray", dash="dash"),
-        )
-        fig.update_traces(marker=dict(size=9))
-        fig.update_layout(
-            xaxis_title="All-Play %",
-            yaxis_title="Actual Win %",
-            coloraxis_colorbar_title="Luck Δ",
-            margin=dict(l=10, r=10, t=30, b=10),
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
-
-    with col2:
-        st.markdown("### 🍀 Luckiest & Unluckiest Teams")
-        sorted_luck = luck_df.sort_values("Luck Δ", ascending=False)
-        st.dataframe(
-            sorted_luck[["Team", "All-Play %", "Actual Win %", "Luck Δ"]]
-            .assign(**{"Luck Δ": sorted_luck["Luck Δ"].map("{:+.1f}".format)})
-            .reset_index(drop=True),
-            use_container_width=True,
-            hide_index=True,
-        )
-
-    # 🔥 Heatmap — Luck vs Power
-    st.subheader("🔥 Luck vs Power Index Heatmap")
-    fig_heat = px.density_heatmap(
-        luck_df,
-        x="Luck Δ",
-        y="Power Index",
-        nbinsx=10,
-        nbinsy=10,
-        color_continuous_scale="Blues",
-        title="Luck Δ vs Power Index Density",
-    )
-    fig_heat.update_layout(
-        margin=dict(l=20, r=20, t=40, b=20),
-        xaxis_title="Luck Δ (Actual Win % - All-Play %)",
-        yaxis_title="Power Index",
+@fragment
+def luck_section():
+    st.subheader("🍀 Luck Index vs Actual Results")
+
+    with perf.span("render:luck"):
+        import plotly.express as px
+
+        luck_df = power.dropna(subset=["Actual Win %", "All-Play %"])
+        if luck_df.empty:
+            st.info("Not enough data to compute luck metrics.")
+            return
+
+        def build_scatter():
+            fig = px.scatter(
+                luck_df,
+                x="All-Play %",
+                y="Actual Win %",
+                color="Luck Δ",
+                color_continuous_scale="Blues_r",
+                hover_data={
+                    "Team": True,
+                    "All-Play %": ":.1f",
+                    "Actual Win %": ":.1f",
+                    "Luck Δ": ":.1f",
+                },
+                title="Luck vs Performance Scatter",
+            )
+            fig.add_shape(
+                type="line",
+                x0=luck_df["All-Play %"].min(),
+                y0=luck_df["All-Play %"].min(),
+                x1=luck_df["All-Play %"].max(),
+                y1=luck_df["All-Play %"].max(),
+                line=dict(color="gray", dash="dash"),
+            )
+            fig.update_traces(marker=dict(size=9))
+            fig.update_layout(
+                xaxis_title="All-Play %",
+                yaxis_title="Actual Win %",
+                coloraxis_colorbar_title="Luck Δ",
+                margin=dict(l=10, r=10, t=30, b=10),
+            )
+            return fig
+
+        def build_heatmap():
+            fig_heat = px.density_heatmap(
+                luck_df,
+                x="Luck Δ",
+                y="Power Index",
+                nbinsx=10,
+                nbinsy=10,
+                color_continuous_scale="Blues",
+                title="Luck Δ vs Power Index Density",
+            )
+            fig_heat.update_layout(
+                margin=dict(l=20, r=20, t=40, b=20),
+                xaxis_title="Luck Δ (Actual Win % - All-Play %)",
+                yaxis_title="Power Index",
+            )
+            return fig_heat
+
+        col1, col2 = st.columns([3, 2])
+        with col1:
+            fig = figcache.figure("advanced:luck scatter", data.cache_key, build_scatter)
+            st.plotly_chart(fig, use_container_width=True)
+
+        with col2:
+            st.markdown("### 🍀 Luckiest & Unluckiest Teams")
+            sorted_luck = data.derive("luck_table", luck_table, power_source, from_sheet=power_from_sheet)
+            st.dataframe(sorted_luck, use_container_width=True, hide_index=True, column_config=LUCK_CONFIG)
+
+        # 🔥 Heatmap — Luck vs Power
+        st.subheader("🔥 Luck vs Power Index Heatmap")
+        fig_heat = figcache.figure("advanced:luck heatmap", data.cache_key, build_heatmap)
+        st.plotly_chart(fig_heat, use_container_width=True)
+
+
+# Metrics scaled 0-100 once per data version; each radar is a row lookup
+with perf.span("compute:metric matrix"):
+    matrix = data.derive(
+        "metric_matrix",
+        power_metric_matrix,
+        power_source,
+        from_sheet=power_from_sheet,
+        metrics=tuple(metrics),
     )
-    st.plotly_chart(fig_heat, use_container_width=True)
-else:
-    st.info("Not enough data to compute luck metrics.")
+teams = sorted(matrix.teams)
+
 
 # -----------------------------------
 # 📡 Normalized Team Performance Radar
 # -----------------------------------
-st.subheader("📡 Normalized Team Performance Radar")
-
-teams = sorted(power["Team"].dropna().unique())
-selected_team = st.selectbox("Select a team", teams)
-
-if selected_team:
-    scaler = MinMaxScaler(feature_range=(0, 100))
-    scaled = power.copy()
-    scaled[metrics] = scaler.fit_transform(scaled[metrics])
-
-    row = scaled[scaled["Team"] == selected_team].iloc[0]
-    fig_radar = go.Figure(
-        go.Scatterpolar(
-            r=[row[m] for m in metrics],
-            theta=metrics,
-            fill="toself",
-            name=selected_team,
-        )
-    )
-    fig_radar.update_layout(
-        polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
-        showlegend=False,
-        margin=dict(l=10, r=10, t=30, b=10),
-    )
-    st.plotly_chart(fig_radar, use_container_width=True)
+@fragment
+def radar_section():
+    st.subheader("📡 Normalized Team Performance Radar")
+
+    selected_team = st.selectbox("Select a team", teams)
+
+    with perf.span("render:radar"):
+        if selected_team:
+            fig_radar = go.Figure(
+                go.Scatterpolar(
+                    r=matrix.values[matrix.teams[selected_team]],
+                    theta=metrics,
+                    fill="toself",
+                    name=selected_team,
+                )
+            )
+            fig_radar.update_layout(
+                polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
+                showlegend=False,
+                margin=dict(l=10, r=10, t=30, b=10),
+            )
+            st.plotly_chart(fig_radar, use_container_width=True)
+
 
 # -----------------------------------
 # 🧩 Multi-Team Radar Overlay Comparison
 # -----------------------------------
-st.subheader("🧩 Compare Two Teams — Multi-Metric Radar Overlay")
-
-team_a, team_b = st.columns(2)
-team1 = team_a.selectbox("Select Team A", teams, key="team_a")
-team2 = team_b.selectbox("Select Team B", teams, key="team_b")
-
-if team1 and team2:
-    scaler = MinMaxScaler(feature_range=(0, 100))
-    scaled = power.copy()
-    scaled[metrics] = scaler.fit_transform(scaled[metrics])
-
-    row1 = scaled[scaled["Team"] == team1].iloc[0]
-    row2 = scaled[scaled["Team"] == team2].iloc[0]
-
-    fig_overlay = go.Figure()
-
-fig_overlay.add_trace(
-    go.Scatterpolar(
-        r=[row1[m] for m in metrics],
-        theta=metrics,
-        fill="toself",
-        name=team1,
-        line=dict(color="#1f77b4", width=2),  # blue
-        fillcolor="rgba(31, 119, 180, 0.3)",
-    )
-)
-
-fig_overlay.add_trace(
-    go.Scatterpolar(
-        r=[row2[m] for m in metrics],
-        theta=metrics,
-        fill="toself",
-        name=team2,
-        line=dict(color="#ff7f0e", width=2),  # orange
-        fillcolor="rgba(255, 127, 14, 0.3)",
-    )
-)
-
-fig_overlay.update_layout(
-    polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
-    showlegend=True,
-    legend=dict(orientation="h", y=-0.2),
-    margin=dict(l=10, r=10, t=30, b=10),
-)
-st.plotly_chart(fig_overlay, use_container_width=True)
+@fragment
+def overlay_section():
+    st.subheader("🧩 Compare Teams — Multi-Metric Radar Overlay")
+
+    compare = st.multiselect("Select teams to compare", teams, default=teams[:2], key="compare_teams")
+
+    with perf.span("render:overlay", teams=len(compare)):
+        if not compare:
+            st.info("Select at least one team to compare.")
+            return
+
+        import plotly.express as px
+
+        colors = px.colors.qualitative.D3  # blue, orange, green, ...
+        fig_overlay = go.Figure()
+        for i, team in enumerate(compare):
+            color = colors[i % len(colors)]
+            red, green, blue = (int(color[k:k + 2], 16) for k in (1, 3, 5))
+            fig_overlay.add_trace(
+                go.Scatterpolar(
+                    r=matrix.values[matrix.teams[team]],
+                    theta=metrics,
+                    fill="toself",
+                    name=team,
+                    line=dict(color=color, width=2),
+                    fillcolor=f"rgba({red}, {green}, {blue}, 0.3)",
+                )
+            )
+
+        fig_overlay.update_layout(
+            polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
+            showlegend=True,
+            legend=dict(orientation="h", y=-0.2),
+            margin=dict(l=10, r=10, t=30, b=10),
+        )
+        st.plotly_chart(fig_overlay, use_container_width=True)
 
 
 # -----------------------------------
 # 🤖 Team Clustering by Power Metrics
 # -----------------------------------
-st.subheader("🤖 Team Clusters by Power Profile")
-
 cluster_features = ["All-Play %", "Actual Win %", "Avg Margin", "SoS Played", "Power Index"]
-cluster_df = power.dropna(subset=cluster_features).copy()
-
-scaler = MinMaxScaler()
-scaled_features = scaler.fit_transform(cluster_df[cluster_features])
-
-kmeans = KMeans(n_clusters=3, n_init=10, random_state=42)
-cluster_df["Cluster"] = kmeans.fit_predict(scaled_features)
-
-fig_cluster = px.scatter_3d(
-    cluster_df,
-    x="Power Index",
-    y="Avg Margin",
-    z="SoS Played",
-    color="Cluster",
-    hover_name="Team",
-    color_continuous_scale="Blues",
-    title="Team Clusters by Power Profile",
-)
-
-# Ensure strongest teams (highest Power Index) appear on the right side
-fig_cluster.update_traces(marker=dict(size=6))
-fig_cluster.update_layout(
-    scene=dict(
-        xaxis=dict(
-            title="Power Index (→ Better Teams →)",
-            autorange="reversed",  # flip axis so better = right
-            backgroundcolor="rgba(0,0,0,0)"
-        ),
-        yaxis=dict(title="Avg Margin", backgroundcolor="rgba(0,0,0,0)"),
-        zaxis=dict(title="SoS Played", backgroundcolor="rgba(0,0,0,0)")
-    ),
-    margin=dict(l=10, r=10, t=40, b=10),
-)
-st.plotly_chart(fig_cluster, use_container_width=True)
 
+
+@fragment
+def clusters_section():
+    st.subheader("🤖 Team Clusters by Power Profile")
+
+    cluster_df = power.dropna(subset=cluster_features)
+
+    # Memoized on the feature matrix; cluster 0 is always the strongest by Power Index
+    with perf.span("compute:kmeans", rows=len(cluster_df)):
+        cluster_df["Cluster"] = cluster_labels(
+            cluster_df[cluster_features], n_clusters=3, order_by="Power Index", namespace=data.namespace
+        )
+
+    def build_clusters():
+        import plotly.express as px
+
+        fig_cluster = px.scatter_3d(
+            cluster_df,
+            x="Power Index",
+            y="Avg Margin",
+            z="SoS Played",
+            color="Cluster",
+            hover_name="Team",
+            color_continuous_scale="Blues",
+            title="Team Clusters by Power Profile",
+        )
+
+        # Ensure strongest teams (highest Power Index) appear on the right side
+        fig_cluster.update_traces(marker=dict(size=6))
+        fig_cluster.update_layout(
+            scene=dict(
+                xaxis=dict(
+                    title="Power Index (→ Better Teams →)",
+                    autorange="reversed",  # flip axis so better = right
+                    backgroundcolor="rgba(0,0,0,0)"
+                ),
+                yaxis=dict(title="Avg Margin", backgroundcolor="rgba(0,0,0,0)"),
+                zaxis=dict(title="SoS Played", backgroundcolor="rgba(0,0,0,0)")
+            ),
+            margin=dict(l=10, r=10, t=40, b=10),
+        )
+        return fig_cluster
+
+    with perf.span("render:clusters"):
+        fig_cluster = figcache.figure("advanced:clusters 3d", data.cache_key, build_clusters)
+        st.plotly_chart(fig_cluster, use_container_width=True)
+
+
+correlation_section()
+luck_section()
+radar_section()
+overlay_section()
+clusters_section()
+
+perf.debug_panel()
@@ -1,46 +1,38 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from utils import week_selector
+import figcache
+import perf
+from analytics import completed_weeks, matchup_pairs, season_totals
+from tables import paged_table
+from utils import get_data
 
 # ---- Page Config ----
 st.set_page_config(page_title="Matchup Summary", layout="wide")
 st.title("📅 Matchup Summary")
+perf.start_page("Matchup Summary")
 
-data = st.session_state["data"]
-matchups = data["matchups"]
+with perf.span("load"):
+    data = get_data()
+    matchups = data["matchups"]
 
 if matchups.empty:
     st.warning("No matchup data available.")
     st.stop()
 
-# ---- Normalize headers ----
-matchups.columns = matchups.columns.str.strip().str.lower()
-
-# ---- Validate Columns ----
+# ---- Validate Columns (headers lowercased, week/pts numeric at load time) ----
 required_cols = {"week", "team", "opp", "pts"}
 if not required_cols.issubset(matchups.columns):
     st.error(f"Missing expected columns: {required_cols - set(matchups.columns)}")
     st.dataframe(matchups.head())
     st.stop()
 
-# ---- Type Cleanup ----
-matchups["week"] = pd.to_numeric(matchups["week"], errors="coerce")
-matchups["pts"] = pd.to_numeric(matchups["pts"], errors="coerce")
-
 # ---- Sidebar Week Selector ----
 st.sidebar.header("⚙️ Filters")
 
-# Convert safely
-matchups["week"] = pd.to_numeric(matchups["week"], errors="coerce")
-matchups["pts"] = pd.to_numeric(matchups["pts"], errors="coerce")
-
-# Only count completed weeks (any pts > 0)
-completed_weeks = (
-    matchups.groupby("week")["pts"]
-    .apply(lambda s: (s > 0).any())
-)
-valid_weeks = sorted(completed_weeks[completed_weeks].index.tolist())
+# Only count completed weeks (any pts > 0); pairs for every week are built once per data version
+with perf.span("compute:pairs"):
+    valid_weeks = data.derive("completed_weeks", completed_weeks, "matchups")
+    pairs = data.derive("matchup_pairs", matchup_pairs, "matchups")
 
 # Default = most recent week with any points > 0
 latest_completed = valid_weeks[-1] if valid_weeks else None
@@ -56,66 +48,46 @@ week = st.sidebar.selectbox(
 # =======================
 st.subheader(f"📊 Results – Week {int(week)}")
 
-week_df = matchups[matchups["week"] == week].copy()
-if week_df.empty:
+# Index slice into the prebuilt pair table (sorted by week)
+week_pairs = pairs.loc[[week]] if week in pairs.index else pairs.iloc[:0]
+if week_pairs.empty:
     st.info("No results found for this week.")
 else:
-    # --- Build matchup pairs ---
-    merged = pd.merge(
-        week_df,
-        week_df,
-        left_on=["week", "team"],
-        right_on=["week", "opp"],
-        suffixes=("_team", "_opp"),
+    # Display results (Home/Away only when the sheet says which side was home)
+    st.dataframe(
+        week_pairs,
+        use_container_width=True,
+        hide_index=True,
     )
 
-    # Avoid duplicate pairs
-    merged = merged[merged["team_team"] < merged["team_opp"]].copy()
-
-    # Winner / margin
-    merged["Winner"] = merged.apply(
-        lambda x: x["team_team"] if x["pts_team"] > x["pts_opp"] else x["team_opp"],
-        axis=1,
-    )
-    merged["Margin"] = (merged["pts_team"] - merged["pts_opp"]).abs().round(2)
-
-    # Rename columns
-    rename_map = {
-        "team_team": "Team",
-        "pts_team": "Points",
-        "team_opp": "Opponent",
-        "pts_opp": "Opp Points",
-    }
-    merged = merged.rename(columns=rename_map)
-
-    # Display results
-    valid_cols = [c for c in ["Team", "Points", "Opponent", "Opp Points", "Winner", "Margin"] if c in merged.columns]
-    st.dataframe(merged[valid_cols], use_container_width=True)
-
     # --- Chart: Points distribution ---
-    fig = px.box(
-        week_df,
-        x="week",
-        y="pts",
-        points="all",
-        title=f"Score Distribution – Week {int(week)}",
-        color_discrete_sequence=["#4C78A8"],
-    )
-    fig.update_layout(showlegend=False, xaxis_title="", yaxis_title="Points")
-    st.plotly_chart(fig, use_container_width=True)
+    with perf.span("render:score box"):
+        import plotly.express as px
+        week_scores = pd.DataFrame({
+            "week": week,
+            "pts": pd.concat([week_pairs["Points"], week_pairs["Opp Points"]], ignore_index=True),
+        })
+        fig = px.box(
+            week_scores,
+            x="week",
+            y="pts",
+            points="all",
+            title=f"Score Distribution – Week {int(week)}",
+            color_discrete_sequence=["#4C78A8"],
+        )
+        fig.update_layout(showlegend=False, xaxis_title="", yaxis_title="Points")
+        st.plotly_chart(fig, use_container_width=True)
 
 # =======================
 #  SEASON TOTALS
 # =======================
 st.subheader("🧮 Season Totals – Points For / Against / Differential")
 
-pf = matchups.groupby("team", as_index=False)["pts"].sum().rename(columns={"pts": "PF"})
-pa = matchups.groupby("opp", as_index=False)["pts"].sum().rename(columns={"opp": "team", "pts": "PA"})
-leaderboard = pf.merge(pa, on="team", how="outer").fillna(0)
-leaderboard["Diff"] = leaderboard["PF"] - leaderboard["PA"]
-leaderboard = leaderboard.sort_values("Diff", ascending=False).reset_index(drop=True)
+# Maintained incrementally (only new or corrected weeks are folded in), cached per data version
+with perf.span("compute:season totals"):
+    leaderboard = data.derive("season_totals", season_totals, "matchups", namespace=data.namespace)
 
-st.dataframe(leaderboard, use_container_width=True)
+paged_table(leaderboard, "season_totals", version=data.cache_key, default_sort="Diff", ascending=False)
 
 # --- Charts ---
 for metric, color, title in [
@@ -123,14 +95,22 @@ for metric, color, title in [
     ("PA", "Reds", "Total Points Against"),
     ("Diff", "Bluered_r", "Point Differential (PF − PA)"),
 ]:
-    fig = px.bar(
-        leaderboard.sort_values(metric, ascending=False),
-        x="team",
-        y=metric,
-        color=metric,
-        text_auto=".0f",
-        color_continuous_scale=color,
-        title=title,
-    )
-    fig.update_layout(showlegend=False)
-    st.plotly_chart(fig, use_container_width=True)
+    def build_bar(metric=metric, color=color, title=title):
+        import plotly.express as px
+        fig = px.bar(
+            leaderboard.sort_values(metric, ascending=False),
+            x="team",
+            y=metric,
+            color=metric,
+            text_auto=".0f",
+            color_continuous_scale=color,
+            title=title,
+        )
+        fig.update_layout(showlegend=False)
+        return fig
+
+    with perf.span(f"render:{metric} bar"):
+        fig = figcache.figure(f"matchup:{metric} bar", data.cache_key, build_bar)
+        st.plotly_chart(fig, use_container_width=True)
+
+perf.debug_panel()
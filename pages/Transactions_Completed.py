@@ -1,73 +1,83 @@
 import streamlit as st
 import pandas as pd
-from utils import load_csv, TRANSACTIONS_URL
+import numpy as np
+import leagues
+import perf
+from analytics import transaction_events
+from tables import paged_table
+from utils import get_data
 
 # ---- Page Config ----
 st.set_page_config(page_title="Completed Transactions", layout="wide")
 st.title("📋 Completed Transactions")
+perf.start_page("Transactions")
 
 # ---- Data Load ----
-@st.cache_data(ttl=300)
-def load_transactions():
-    """Load transactions_completed CSV from Google Sheets."""
-    return load_csv(TRANSACTIONS_URL)
-
-with st.spinner("Loading transactions..."):
-    df = load_transactions()
+# The refresh worker ingests new transactions into the local store (store.py);
+# this is the stored log, not a fresh download of the whole tab
+with st.spinner("Loading transactions..."), perf.span("load"):
+    data = get_data()
+    df = data.get("transactions", pd.DataFrame())
 
 # ---- Handle empty data ----
 if df.empty:
     st.info("No completed transactions found.")
     st.stop()
 
-# ---- Filter out lineup changes and unwanted transaction types ----
-df = df[df["details"].str.contains("Add:|Drop:", case=False, na=False)]
-
-# ---- Remove unnecessary columns ----
-df = df.drop(columns=["id", "type", "time", "status"], errors="ignore")
+# ---- Parse details into player-level events (once per data version) ----
+# Lineup changes carry no Add/Drop entries and produce no events
+with perf.span("compute:events"):
+    log = data.derive(
+        "transaction_events", transaction_events, "transactions",
+        season_start=leagues.get(data.namespace).season_start,
+    )
+events = log.events
 
 # ---- Sidebar Filter ----
 st.sidebar.header("⚙️ Filter")
-teams = sorted(df["team"].dropna().unique().tolist())
-selected_team = st.sidebar.selectbox("Select Team", ["All Teams"] + teams)
+selected_team = st.sidebar.selectbox("Select Team", ["All Teams"] + list(log.teams))
 
-filtered_df = df if selected_team == "All Teams" else df[df["team"] == selected_team]
+rows = None if selected_team == "All Teams" else log.teams[selected_team]
+players = sorted(log.players) if rows is None else sorted(events["player"].take(rows).unique())
+selected_player = st.sidebar.selectbox("Select Player", ["All Players"] + players)
+if selected_player != "All Players":
+    player_rows = log.players[selected_player]
+    rows = player_rows if rows is None else np.intersect1d(rows, player_rows, assume_unique=True)
 
-# ---- Compute total moves per team ----
-if "team" in df.columns and not df.empty:
-    move_counts = (
-        df["team"]
-        .value_counts()
-        .reset_index()
-        .rename(columns={"index": "Team", df["team"].name: "Moves"})
-        .convert_dtypes()
-        .sort_values(by="Moves", ascending=False)
-    )
-else:
-    move_counts = pd.DataFrame(columns=["Team", "Moves"])
+filtered_df = events if rows is None else events.take(rows)
 
 # ---- Summary Metrics ----
 st.subheader("Summary")
-col1, col2 = st.columns(2)
-col1.metric("Total Transactions", f"{len(filtered_df):,}")
-col2.metric("Unique Teams", filtered_df["team"].nunique())
+actions = filtered_df["action"].value_counts()
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Total Transactions", f"{filtered_df['id'].nunique():,}")
+col2.metric("Adds", f"{actions.get('Add', 0):,}")
+col3.metric("Drops", f"{actions.get('Drop', 0):,}")
+col4.metric("Unique Teams", filtered_df["team"].nunique())
 
 
 # ---- Display Transactions ----
 st.subheader("Transactions Table")
-if not filtered_df.empty:
-    st.dataframe(
-        filtered_df.sort_values(by="team").reset_index(drop=True),
-        use_container_width=True,
-        hide_index=True,
-    )
-else:
-    st.info("No transactions match the selected team.")
+with perf.span("render:table"):
+    if not filtered_df.empty:
+        # Sorted, searched and paged server-side; only the visible page is sent
+        paged_table(
+            filtered_df,
+            "transactions",
+            version=(data.cache_key, selected_team, selected_player),
+            default_sort="team",
+            search_columns=["player", "position", "action"],
+            column_config={"time": st.column_config.DatetimeColumn("time", format="MMM D, h:mm a")},
+        )
+    else:
+        st.info("No transactions match the selected filters.")
 
 # ---- CSV Download ----
 st.download_button(
     "⬇️ Download CSV",
-    data=filtered_df.to_csv(index=False).encode("utf-8"),
+    data=lambda: filtered_df.to_csv(index=False).encode("utf-8"),   # built on click, not every rerun
     file_name="transactions_completed.csv",
     mime="text/csv",
 )
+
+perf.debug_panel()
@@ -0,0 +1,89 @@
+"""
+Per-stage timing for pages.
+
+    perf.start_page("Power Rankings")
+    with perf.span("load"):
+        data = get_data()
+    ...
+    perf.debug_panel()
+
+Timing is on when FANTASY_TIMING=1 is set or the page is opened with
+?debug=1. Each finished span is logged as one JSON line on the
+"fantasy.timing" logger and, with ?debug=1, listed in a sidebar panel.
+When timing is off, span() returns a shared no-op context manager.
+"""
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+
+import streamlit as st
+
+ENABLED = os.environ.get("FANTASY_TIMING", "") not in ("", "0")
+
+log = logging.getLogger("fantasy.timing")
+if ENABLED:
+    # Nothing else configures logging at INFO; give the JSON lines their own stderr handler
+    if not log.handlers:
+        _handler = logging.StreamHandler()
+        _handler.setFormatter(logging.Formatter("%(message)s"))
+        log.addHandler(_handler)
+        log.propagate = False
+    log.setLevel(logging.INFO)
+
+_NOOP = contextlib.nullcontext()
+_local = threading.local()  # each script run has its own thread
+
+
+class _Span:
+    __slots__ = ("name", "fields", "start")
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        _local.stack.append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        ms = (time.perf_counter() - self.start) * 1000
+        path = "/".join(_local.stack)
+        _local.stack.pop()
+        record = {"page": _local.page, "span": path, "ms": round(ms, 2), **self.fields}
+        _local.spans.append(record)
+        log.info(json.dumps(record, default=str))
+        return False
+
+
+def start_page(page):
+    """Reset this run's spans; decides whether timing is on for the run."""
+    debug = st.query_params.get("debug") == "1"
+    _local.page = page
+    _local.panel = debug
+    _local.stack = []
+    _local.spans = [] if (ENABLED or debug) else None
+
+
+def span(name, **fields):
+    """Time a block. Extra keyword fields are included in the JSON log line."""
+    if getattr(_local, "spans", None) is None:
+        return _NOOP
+    return _Span(name, fields)
+
+
+def debug_panel():
+    """Sidebar table of this run's spans (only with ?debug=1)."""
+    if not getattr(_local, "panel", False) or not _local.spans:
+        return
+    with st.sidebar.expander("⏱️ Stage timings", expanded=True):
+        total = sum(s["ms"] for s in _local.spans if "/" not in s["span"])
+        st.caption(f"{_local.page}: {total:.1f} ms across top-level stages")
+        st.dataframe(
+            [{"Stage": s["span"], "ms": s["ms"]} for s in _local.spans],
+            hide_index=True,
+            use_container_width=True,
+        )
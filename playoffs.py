@@ -0,0 +1,151 @@
+"""
+Monte Carlo playoff odds.
+
+Plays out the rest of the regular season from `matchups` many times over,
+seeds the playoff field and runs the bracket drawn on the Standings page:
+
+    Play-in: 4 vs 5    Semifinals: 1 vs (4/5), 2 vs 3    Final
+
+Each team's weekly score is drawn from a normal distribution fit to the scores
+it has posted so far (spread shrunk toward the league's). Seasons are
+simulated in chunks as NumPy arrays, optionally across a process pool.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from analytics import completed_weeks
+
+PLAYOFF_TEAMS = 5
+BYES = 3            # seeds 1-3 skip the play-in
+SIMULATIONS = 100_000
+CHUNK = 20_000
+PRIOR_GAMES = 3     # weight of the league-wide spread in each team's std
+
+# Process-pool workers for large runs; 0 keeps everything in-process
+WORKERS = int(os.environ.get("FANTASY_SIM_WORKERS", "0") or 0)
+
+ODDS_COLUMNS = [f"Seed {i}" for i in range(1, PLAYOFF_TEAMS + 1)] + ["Playoffs", "Bye", "Champion"]
+
+
+def _season(matchups):
+    """Latest season's games as (teams, played rows, remaining (team, opp) index pairs)."""
+    m = matchups
+    if "season" in m.columns:
+        m = m[m["season"] == m["season"].max()]
+    m = m[["week", "team", "opp", "pts"]].dropna(subset=["week", "team", "opp"])
+    teams = np.unique(np.concatenate([m["team"].to_numpy(dtype=object), m["opp"].to_numpy(dtype=object)]))
+
+    played = m["week"].isin(completed_weeks(m)) & m["pts"].notna()
+    future = m[~played & (m["team"] < m["opp"])]
+    remaining = np.column_stack([
+        np.searchsorted(teams, future["team"].to_numpy(dtype=object)),
+        np.searchsorted(teams, future["opp"].to_numpy(dtype=object)),
+    ]).astype(np.intp).reshape(-1, 2)
+    return teams, m[played], remaining
+
+
+def _model(teams, played):
+    """Per-team score mean/std plus current wins and points for (tiebreaker)."""
+    idx = np.searchsorted(teams, played["team"].to_numpy(dtype=object))
+    pts = played["pts"].to_numpy(dtype=float)
+    games = np.bincount(idx, minlength=len(teams))
+    # float64 throughout: bincount returns int64 when there are no games yet
+    pf = np.bincount(idx, weights=pts, minlength=len(teams)).astype(np.float64)
+
+    league_mean = pts.mean() if len(pts) else 100.0
+    league_var = pts.var() if len(pts) > 1 else 400.0
+    mean = np.where(games > 0, pf / np.maximum(games, 1), league_mean)
+    sq = np.bincount(idx, weights=(pts - mean[idx]) ** 2, minlength=len(teams))
+    std = np.sqrt((sq + PRIOR_GAMES * league_var) / (games + PRIOR_GAMES))
+
+    opp_pts = played.merge(
+        played.rename(columns={"team": "opp", "opp": "team", "pts": "opp_pts"}),
+        on=["week", "team", "opp"], how="left",
+    )["opp_pts"].to_numpy(dtype=float)
+    result = np.where(pts > opp_pts, 1.0, np.where(pts == opp_pts, 0.5, 0.0))
+    wins = np.bincount(idx, weights=np.nan_to_num(result), minlength=len(teams)).astype(np.float64)
+    return mean, std, wins, pf
+
+
+def _winner(a, b, mean, std, rng):
+    """Vectorized single game between team index arrays `a` and `b`."""
+    score_a = mean[a] + std[a] * rng.standard_normal(len(a), dtype=np.float32)
+    score_b = mean[b] + std[b] * rng.standard_normal(len(b), dtype=np.float32)
+    return np.where(score_a >= score_b, a, b)
+
+
+def _simulate_chunk(n, mean, std, wins, pf, remaining, seed):
+    """Simulate `n` seasons; returns (seed counts [teams x seeds], champion counts, summed final wins)."""
+    rng = np.random.default_rng(seed)
+    n_teams = len(mean)
+    total_wins = np.broadcast_to(wins, (n, n_teams)).astype(np.float64)
+    total_pf = np.broadcast_to(pf, (n, n_teams)).astype(np.float64)
+
+    if len(remaining):
+        home, away = remaining[:, 0], remaining[:, 1]
+        # float32 draws: half the memory and roughly 4x faster than rng.normal
+        z = rng.standard_normal((2, n, len(remaining)), dtype=np.float32)
+        home_pts = mean[home].astype(np.float32) + std[home].astype(np.float32) * z[0]
+        away_pts = mean[away].astype(np.float32) + std[away].astype(np.float32) * z[1]
+        home_win = (home_pts > away_pts).astype(np.float32)
+        # game -> team incidence matrices turn per-game results into per-team totals
+        on_home = np.zeros((len(remaining), n_teams), dtype=np.float32)
+        on_home[np.arange(len(remaining)), home] = 1
+        on_away = np.zeros((len(remaining), n_teams), dtype=np.float32)
+        on_away[np.arange(len(remaining)), away] = 1
+        total_wins += home_win @ on_home + (1 - home_win) @ on_away
+        total_pf += home_pts @ on_home + away_pts @ on_away
+
+    # Wins first, points for breaks ties; only the top PLAYOFF_TEAMS need ordering
+    key = -(total_wins * 1e6 + total_pf)
+    top = np.argpartition(key, PLAYOFF_TEAMS - 1, axis=1)[:, :PLAYOFF_TEAMS]
+    field = np.take_along_axis(top, np.argsort(np.take_along_axis(key, top, axis=1), axis=1), axis=1)
+
+    seed_counts = np.zeros((n_teams, PLAYOFF_TEAMS), dtype=np.int64)
+    for s in range(PLAYOFF_TEAMS):
+        seed_counts[:, s] = np.bincount(field[:, s], minlength=n_teams)
+
+    play_in = _winner(field[:, 3], field[:, 4], mean, std, rng)
+    semi_1 = _winner(field[:, 0], play_in, mean, std, rng)
+    semi_2 = _winner(field[:, 1], field[:, 2], mean, std, rng)
+    champion = _winner(semi_1, semi_2, mean, std, rng)
+    return seed_counts, np.bincount(champion, minlength=n_teams), total_wins.sum(axis=0)
+
+
+def playoff_odds(matchups, simulations=SIMULATIONS, workers=WORKERS, seed=0):
+    """
+    Probability of each seed, a playoff spot, a bye and the championship for
+    every team, as of the completed weeks in `matchups`. Returns a frame with
+    Team, Proj Wins and ODDS_COLUMNS (0-1), sorted by Champion; empty when
+    there are fewer than PLAYOFF_TEAMS teams.
+    """
+    if matchups.empty:
+        return pd.DataFrame(columns=["Team", "Proj Wins", *ODDS_COLUMNS])
+    teams, played, remaining = _season(matchups)
+    if len(teams) < PLAYOFF_TEAMS:
+        return pd.DataFrame(columns=["Team", "Proj Wins", *ODDS_COLUMNS])
+    mean, std, wins, pf = _model(teams, played)
+
+    sizes = [CHUNK] * (simulations // CHUNK) + ([simulations % CHUNK] if simulations % CHUNK else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(n, mean, std, wins, pf, remaining, s) for n, s in zip(sizes, seeds)]
+    if workers and len(args) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_simulate_chunk, *zip(*args)))
+    else:
+        results = [_simulate_chunk(*a) for a in args]
+
+    seed_counts = sum(r[0] for r in results) / simulations
+    champion = sum(r[1] for r in results) / simulations
+    proj = sum(r[2] for r in results) / simulations
+
+    odds = pd.DataFrame(seed_counts, columns=ODDS_COLUMNS[:PLAYOFF_TEAMS])
+    odds.insert(0, "Team", teams)
+    odds.insert(1, "Proj Wins", proj.round(1))
+    odds["Playoffs"] = seed_counts.sum(axis=1)
+    odds["Bye"] = seed_counts[:, :BYES].sum(axis=1)
+    odds["Champion"] = champion
+    return odds.sort_values(["Champion", "Playoffs"], ascending=False).reset_index(drop=True)
@@ -0,0 +1,146 @@
+"""
+Background refresh worker with stale-while-revalidate semantics.
+
+Readers always get the last good bundle immediately. A daemon thread refetches
+on a fixed interval and swaps in the new bundle when it lands; a source that
+fails keeps serving its previous frame. Only the very first load in a fresh
+process (with nothing in the disk cache) blocks a page render; prime() starts
+it without blocking, so the landing page can paint first. A warm start from
+the disk cache is revalidated right away, once even when the worker is off.
+"""
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+REFRESH_SECONDS = int(os.environ.get("FANTASY_REFRESH_SECONDS", 15 * 60))  # 0 disables the worker
+
+# version increases whenever any frame changes; fetched_at is a Unix timestamp
+Bundle = namedtuple("Bundle", ["frames", "timings", "errors", "version", "fetched_at"])
+
+log = logging.getLogger(__name__)
+
+
+class Refresher:
+    def __init__(self, fetch, interval=REFRESH_SECONDS, warm=None):
+        """
+        fetch() -> (frames, timings, errors) does a full network load.
+        warm() -> frames serves whatever is available offline (e.g. disk cache).
+        """
+        self._fetch = fetch
+        self._warm = warm
+        self.interval = interval
+        self._bundle = None
+        self._lock = threading.Lock()         # guards _bundle swaps
+        self._refreshing = threading.Lock()   # one fetch at a time
+        self._wake = threading.Event()
+        self._thread = None
+        self._priming = None
+        self._stopped = False
+
+    @property
+    def version(self):
+        bundle = self._bundle
+        return bundle.version if bundle else 0
+
+    def current(self):
+        """Return the last good bundle, loading one first only if none exists."""
+        if self._bundle is None:
+            with self._refreshing:
+                if self._bundle is None:
+                    frames = self._warm() if self._warm else None
+                    if frames:
+                        self.publish(frames)
+                        self._revalidate()
+                    else:
+                        self.publish(*self._fetch())
+        self.start()
+        return self._bundle
+
+    def prime(self):
+        """
+        Start the first load on a background thread without waiting for it.
+        Returns True when a bundle is already available. A later current()
+        waits on that same load instead of starting another.
+        """
+        if self._bundle is not None:
+            self.start()
+            return True
+        with self._lock:
+            if self._priming is None or not self._priming.is_alive():
+                self._priming = threading.Thread(target=self._prime, name="data-prime", daemon=True)
+                self._priming.start()
+        return False
+
+    def _prime(self):
+        try:
+            self.current()
+        except Exception:
+            log.exception("Initial data load failed")
+
+    def _revalidate(self):
+        """Refetch in the background right away: via the worker, or once when it is disabled."""
+        if self.interval > 0:
+            self._wake.set()
+        elif not self._stopped:
+            threading.Thread(target=self._refresh_logged, name="data-revalidate", daemon=True).start()
+
+    def _refresh_logged(self):
+        try:
+            self.refresh()
+        except Exception:
+            log.exception("Background refresh failed; serving last good data")
+
+    def refresh(self):
+        """Fetch now (blocking) and publish the result."""
+        with self._refreshing:
+            self.publish(*self._fetch())
+
+    def publish(self, frames, timings=None, errors=None):
+        """Swap in a new bundle, keeping the previous frame for any source that failed."""
+        errors = errors or {}
+        with self._lock:
+            old = self._bundle
+            if old is not None:
+                frames = {
+                    name: old.frames[name] if name in errors and name in old.frames else frame
+                    for name, frame in frames.items()
+                }
+            changed = (
+                old is None
+                or frames.keys() != old.frames.keys()
+                or any(
+                    frames[name] is not old.frames[name]
+                    and not (frames[name].empty and old.frames[name].empty)
+                    for name in frames
+                )
+            )
+            version = (old.version if old else 0) + int(changed)
+            self._bundle = Bundle(frames, timings or {}, errors, version, time.time())
+        if changed:
+            log.info("Published data version %d", version)
+        return self._bundle
+
+    def start(self):
+        """Start the refresh thread once; a no-op when the interval is 0 or after stop()."""
+        if self.interval <= 0 or self._stopped:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="data-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the refresh thread after its current fetch; used when a league is unloaded."""
+        self._stopped = True
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stopped:
+                return
+            self._refresh_logged()
@@ -0,0 +1,175 @@
+"""
+Column schemas for every sheet tab.
+
+Sheets export everything as text. Each table is typed here once, at load time,
+so pages receive numeric/categorical columns and never re-parse strings.
+The power table's shared derived columns are built here as well.
+"""
+import hashlib
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    lower_headers: bool = False   # lowercase headers after cleanup (pages match on lowercase names)
+    aliases: dict = field(default_factory=dict)   # raw header -> canonical header
+    numeric: tuple = ()           # parsed with pd.to_numeric(errors="coerce")
+    percent: tuple = ()           # '61%', '61.0 %', 0.61 -> 61.0
+    categorical: tuple = ()       # low-cardinality labels stored as category
+    infer_numeric: bool = False   # also convert any other column that is entirely numeric text
+
+
+SCHEMAS = {
+    "standings": TableSchema(
+        aliases={"Win %": "Win%", "Win Pct": "Win%"},
+        numeric=("Wins", "Losses", "Ties", "Win%", "PF", "PA"),
+        infer_numeric=True,
+    ),
+    "allplay": TableSchema(
+        aliases={"Win %": "Win%"},
+        numeric=("Wins", "Losses", "Ties", "Win%"),
+    ),
+    "injuries": TableSchema(
+        lower_headers=True,
+        categorical=("status", "injury status", "injurystatus", "position", "pos"),
+    ),
+    "power": TableSchema(
+        aliases={
+            "Actual Win": "Actual Win %",
+            "Actual Win%": "Actual Win %",
+            "Actual Win Percentage": "Actual Win %",
+            "All-Play%": "All-Play %",
+            "SoSΔvsAvg": "SoS Δ vs Avg",  # common sheet-export quirk
+        },
+        numeric=(
+            "PF",
+            "Avg Margin",
+            "Recent Form (3-wk avg)",
+            "Recent Margin (3-wk avg)",
+            "SoS Played",
+            "SoS Remaining",
+            "SoS Δ vs Avg",
+            "Power Index",
+            "Rank",
+        ),
+        percent=("All-Play %", "Actual Win %"),
+    ),
+    "matchups": TableSchema(
+        lower_headers=True,
+        numeric=("week", "pts"),
+    ),
+    "transactions": TableSchema(
+        categorical=("type", "status"),
+    ),
+}
+
+
+def clean_headers(columns):
+    """Strip whitespace, non-breaking spaces and BOMs from sheet headers."""
+    return (
+        pd.Index(columns).astype(str)
+        .str.replace("\ufeff", "", regex=False)    # BOM
+        .str.replace("\u00a0", " ", regex=False)   # non-breaking space
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+    )
+
+
+def to_percent(series):
+    """Vectorized: accepts 0.61, 61, '61%', '0.61', '61.0 %' and returns 61.0 style floats."""
+    digits = series.astype(str).str.replace(r"[^0-9.\-]", "", regex=True)
+    vals = pd.to_numeric(digits, errors="coerce")
+    # If 0..1, treat as fraction -> percent
+    return vals.where(~vals.between(0, 1), vals * 100)
+
+
+def _is_numeric_text(series):
+    text = series.astype(str).str.strip()
+    filled = text != ""
+    return filled.any() and pd.to_numeric(text[filled], errors="coerce").notna().all()
+
+
+def apply_schema(name, df):
+    """Return a typed copy of raw sheet frame `df` according to SCHEMAS[name]."""
+    schema = SCHEMAS.get(name)
+    if schema is None or df.empty:
+        return df
+
+    df = df.copy()
+    df.columns = clean_headers(df.columns)
+    if schema.lower_headers:
+        df.columns = df.columns.str.lower()
+    df = df.rename(columns=schema.aliases)
+
+    for col in schema.percent:
+        if col in df.columns:
+            df[col] = to_percent(df[col])
+    numeric = [c for c in schema.numeric if c in df.columns and c not in schema.percent]
+    if schema.infer_numeric:
+        typed = set(numeric) | set(schema.percent) | set(schema.categorical)
+        numeric += [c for c in df.columns if c not in typed and _is_numeric_text(df[c])]
+    for col in numeric:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    for col in schema.categorical:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+# -----------------------------------
+# Power table normalization (shared by Power Rankings and Advanced Analytics)
+# -----------------------------------
+POWER_COLUMNS = [
+    "Rank",
+    "Team",
+    "PF",
+    "All-Play %",
+    "Actual Win %",
+    "Avg Margin",
+    "Recent Form (3-wk avg)",
+    "Recent Margin (3-wk avg)",
+    "SoS Played",
+    "SoS Remaining",
+    "SoS Δ vs Avg",
+    "Power Index",
+]
+
+_POWER_MEMO_SIZE = 8
+_power_memo = {}  # content hash -> (normalized frame, missing columns)
+
+
+def content_hash(df):
+    """Stable hash of a frame's headers, index and values."""
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def normalize_power(power):
+    """
+    Validate a typed power table and add the derived columns both power pages use:
+    SoS ranks (1 = hardest, ties share rank) and Luck Δ, sorted by Rank.
+    Returns (frame, missing_columns). Memoized on the content hash of `power`,
+    so the returned frame is shared and must be treated as read-only.
+    """
+    key = content_hash(power)
+    if key in _power_memo:
+        return _power_memo[key]
+
+    missing = [c for c in POWER_COLUMNS if c not in power.columns]
+    if missing:
+        result = (power, missing)
+    else:
+        ranks = power[["SoS Played", "SoS Remaining", "SoS Δ vs Avg"]].rank(method="min", ascending=False)
+        out = power.assign(
+            **{f"{col} Rank": ranks[col].astype("Int64") for col in ranks.columns},
+            **{"Luck Δ": power["Actual Win %"] - power["All-Play %"]},
+        )
+        result = (out.sort_values("Rank").reset_index(drop=True), [])
+
+    if len(_power_memo) >= _POWER_MEMO_SIZE:
+        _power_memo.pop(next(iter(_power_memo)))
+    _power_memo[key] = result
+    return result
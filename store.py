@@ -0,0 +1,166 @@
+"""
+Local SQLite store for data that must outlive a session or a process.
+
+All-Play snapshots are append-only and keyed by (snapshot_date, team_id),
+so trend lookups are primary-key reads rather than in-memory scans.
+Completed transactions are append-only too: each is stored once under its
+sheet `id`, along with how many sheet rows have been ingested, so a refresh
+only has to fetch and insert the rows after that. Each (league, season)
+namespace has its own database; the default league keeps the original
+location.
+"""
+import json
+import logging
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+import disk_cache
+import leagues
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS allplay_snapshots (
+    snapshot_date TEXT NOT NULL,
+    team_id       TEXT NOT NULL,
+    team          TEXT,
+    wins          REAL,
+    losses        REAL,
+    win_pct       REAL,
+    PRIMARY KEY (snapshot_date, team_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS transactions (
+    id   TEXT PRIMARY KEY,
+    seq  INTEGER NOT NULL,   -- ingestion order (sheet order)
+    row  TEXT NOT NULL       -- the raw sheet row as JSON {header: text}
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS transactions_seq ON transactions (seq);
+
+CREATE TABLE IF NOT EXISTS ingest_state (
+    source     TEXT PRIMARY KEY,
+    sheet_rows INTEGER NOT NULL  -- sheet rows already ingested
+) WITHOUT ROWID;
+"""
+
+
+def db_path(namespace=None):
+    root = Path(disk_cache.CACHE_DIR)
+    if namespace is None or tuple(namespace) == leagues.DEFAULT.namespace:
+        return root / "store.sqlite3"
+    key, season = namespace
+    return root / "leagues" / key / season / "store.sqlite3"
+
+
+_ready = set()   # database paths whose schema this process has created
+_ready_lock = threading.Lock()
+
+
+def connect(namespace=None):
+    """Open the namespace's database, creating it (WAL mode, schema) once per process."""
+    path = db_path(namespace)
+    if path not in _ready:
+        with _ready_lock:
+            if path not in _ready:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with closing(sqlite3.connect(path, timeout=10)) as conn:
+                    conn.execute("PRAGMA journal_mode=WAL")   # persistent: stored in the database file
+                    conn.executescript(_SCHEMA)
+                _ready.add(path)
+    return sqlite3.connect(path, timeout=10)
+
+
+def record_allplay_snapshot(allplay, snapshot_date=None, namespace=None):
+    """
+    Append today's All-Play standings. The first snapshot of a day wins; later
+    writes for the same date are ignored. Returns the number of rows added.
+    """
+    if allplay.empty or not {"Team", "Win%"}.issubset(allplay.columns):
+        return 0
+    snapshot_date = snapshot_date or datetime.now().strftime("%Y-%m-%d")
+    df = allplay.dropna(subset=["Team", "Win%"])
+    ids = df["team_id"] if "team_id" in df.columns else df["Team"]
+    rows = zip(
+        [snapshot_date] * len(df),
+        ids.astype(str),
+        df["Team"].astype(str),
+        df["Wins"] if "Wins" in df.columns else [None] * len(df),
+        df["Losses"] if "Losses" in df.columns else [None] * len(df),
+        df["Win%"],
+    )
+    with closing(connect(namespace)) as conn, conn:
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO allplay_snapshots VALUES (?, ?, ?, ?, ?, ?)",
+            ((d, i, t, _num(w), _num(l), _num(p)) for d, i, t, w, l, p in rows),
+        )
+        return conn.total_changes - before
+
+
+def previous_allplay(before_date, namespace=None):
+    """
+    Win% per team_id from the latest snapshot strictly before `before_date`
+    (columns: team_id, Win%_prev, snapshot_date). Empty when there is none.
+    """
+    query = """
+        SELECT team_id, win_pct AS "Win%_prev", snapshot_date
+        FROM allplay_snapshots
+        WHERE snapshot_date = (
+            SELECT MAX(snapshot_date) FROM allplay_snapshots WHERE snapshot_date < ?
+        )
+    """
+    with closing(connect(namespace)) as conn:
+        return pd.read_sql_query(query, conn, params=(before_date,))
+
+
+def transactions_synced(namespace=None):
+    """Number of transaction sheet rows already ingested (0 when none)."""
+    with closing(connect(namespace)) as conn:
+        row = conn.execute("SELECT sheet_rows FROM ingest_state WHERE source = 'transactions'").fetchone()
+    return row[0] if row else 0
+
+
+def last_transaction_id(namespace=None):
+    """Id of the most recently ingested transaction, or None."""
+    with closing(connect(namespace)) as conn:
+        row = conn.execute("SELECT id FROM transactions ORDER BY seq DESC LIMIT 1").fetchone()
+    return row[0] if row else None
+
+
+def append_transactions(raw, id_col, sheet_rows, namespace=None):
+    """
+    Insert the rows of raw (string) frame `raw` whose `id_col` hasn't been
+    seen, and record that `sheet_rows` sheet rows are now ingested. Duplicate
+    and blank ids are skipped. Returns the rows that were added.
+    """
+    rows = raw[raw[id_col].str.strip() != ""].drop_duplicates(subset=id_col)
+    added = []
+    with closing(connect(namespace)) as conn, conn:
+        seq = conn.execute("SELECT COALESCE(MAX(seq), -1) FROM transactions").fetchone()[0]
+        for pos, record in enumerate(rows.to_dict("records")):
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO transactions VALUES (?, ?, ?)",
+                (record[id_col].strip(), seq + 1 + len(added), json.dumps(record)),
+            )
+            if cur.rowcount:
+                added.append(pos)
+        conn.execute(
+            "INSERT OR REPLACE INTO ingest_state VALUES ('transactions', ?)", (int(sheet_rows),)
+        )
+    return rows.iloc[added]
+
+
+def read_transactions(namespace=None):
+    """Every stored transaction as a raw string frame, in ingestion order."""
+    with closing(connect(namespace)) as conn:
+        rows = [json.loads(r) for (r,) in conn.execute("SELECT row FROM transactions ORDER BY seq")]
+    return pd.DataFrame.from_records(rows).fillna("").astype(str) if rows else pd.DataFrame()
+
+
+def _num(value):
+    return None if pd.isna(value) else float(value)
@@ -0,0 +1,128 @@
+"""
+Paged tables: sort, search and paginate on the server, send one page.
+
+    paged_table(events, "transactions", version=(data.cache_key, team),
+                default_sort="time", ascending=False, search_columns=["player"])
+
+st.dataframe serializes every row it is given on every rerun. paged_table
+keeps the frame on the server and hands st.dataframe only the visible page.
+Sort orders and search matches are row positions, memoized per (version,
+table key, column or query), so paging through a cached frame does no work
+beyond slicing. Pass a `version` that changes whenever the frame does (the
+DataView cache key plus any filters that produced it); without one nothing
+is memoized. Tables that fit on one page render as a plain st.dataframe,
+which sorts in the browser. The component is a fragment: paging reruns the
+table, not the page.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import fragment
+
+PAGE_SIZE = 50
+MEMO_SIZE = 64
+
+_memo = OrderedDict()   # (version, table key, kind, ...) -> row positions or match mask
+_lock = threading.Lock()
+
+
+def _memoized(key, compute):
+    if key[0] is None:
+        return compute()
+    with _lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key]
+    value = compute()
+    with _lock:
+        _memo[key] = value
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return value
+
+
+def _sort_order(frame, column, ascending):
+    """Row positions of `frame` sorted by `column` (stable, missing values last)."""
+    values = frame[column].reset_index(drop=True)
+    return values.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+
+
+def _search_mask(frame, columns, query):
+    """Rows where any of `columns` contains `query` (case-insensitive)."""
+    mask = np.zeros(len(frame), dtype=bool)
+    for col in columns:
+        values = frame[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Match the (few) categories once, then select rows by code
+            hits = values.cat.categories.astype(str).str.contains(query, case=False, regex=False)
+            mask |= np.isin(values.cat.codes.to_numpy(), np.flatnonzero(hits))
+        else:
+            mask |= values.astype(str).str.contains(query, case=False, regex=False, na=False).to_numpy()
+    return mask
+
+
+def _first_page(page_key):
+    st.session_state[page_key] = 1
+
+
+@fragment
+def paged_table(
+    frame,
+    key,
+    version=None,
+    page_size=PAGE_SIZE,
+    sort_columns=None,
+    default_sort=None,
+    ascending=True,
+    search_columns=None,
+    column_config=None,
+    hide_index=True,
+):
+    """
+    Render `frame` one page at a time with server-side sort (any of
+    `sort_columns`, default: all) and search (over `search_columns`).
+    `key` must be unique on the page; widget state lives under it.
+    """
+    if len(frame) <= page_size:
+        st.dataframe(frame, use_container_width=True, hide_index=hide_index, column_config=column_config)
+        return
+
+    sort_columns = list(sort_columns or frame.columns)
+    page_key = f"{key}:page"
+    reset = dict(on_change=_first_page, args=(page_key,))   # a new sort or search starts at page 1
+    controls = st.columns([3, 2, 1, 1]) if search_columns else [None, *st.columns([2, 1, 1])]
+
+    query = ""
+    if search_columns:
+        query = controls[0].text_input(
+            "Search", key=f"{key}:search", placeholder=f"Search {', '.join(search_columns)}", **reset
+        ).strip()
+    sort = controls[1].selectbox(
+        "Sort by", sort_columns, key=f"{key}:sort",
+        index=sort_columns.index(default_sort) if default_sort in sort_columns else 0, **reset
+    )
+    order = controls[2].selectbox(
+        "Order", ["Ascending", "Descending"], key=f"{key}:order", index=0 if ascending else 1, **reset
+    )
+
+    positions = _memoized((version, key, "sort", sort, order), lambda: _sort_order(frame, sort, order == "Ascending"))
+    if query:
+        mask = _memoized((version, key, "search", query), lambda: _search_mask(frame, search_columns, query))
+        positions = positions[mask[positions]]
+
+    pages = max(1, -(-len(positions) // page_size))
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages   # the result shrank under the current page
+    page = controls[3].number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+
+    start = (page - 1) * page_size
+    visible = frame.iloc[positions[start:start + page_size]]
+    st.dataframe(visible, use_container_width=True, hide_index=hide_index, column_config=column_config)
+    if len(positions):
+        st.caption(f"Rows {start + 1:,}–{start + len(visible):,} of {len(positions):,} · page {page} of {pages}")
+    else:
+        st.caption("No rows match the search.")
@@ -0,0 +1,94 @@
+"""
+Shared fixtures: an isolated cache directory, and a local HTTP server that
+stands in for the Google Sheets CSV endpoints.
+"""
+import hashlib
+import http.server
+import socketserver
+import sys
+import threading
+import urllib.parse
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import disk_cache  # noqa: E402
+import store  # noqa: E402
+
+LAST_MODIFIED = "Mon, 01 Sep 2025 00:00:00 GMT"
+
+
+class SheetServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """
+    Serves `files[path]` (CSV bytes). With `validators` on, responses carry an
+    ETag and Last-Modified, and a matching If-None-Match gets a 304. An
+    `offset=N` query (the query endpoint's stand-in) skips the first N data
+    rows. Every request is recorded in `requests` as (path, query, status,
+    If-None-Match header).
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.files = {}
+        self.validators = True
+        self.requests = []
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        body = self.server.files.get(url.path)
+        if body is not None and "offset" in query:
+            header, *rows = body.splitlines(keepends=True)
+            body = b"".join([header, *rows[int(query["offset"][0]):]])
+        etag = f'"{hashlib.sha1(body).hexdigest()}"' if body is not None else None
+        conditional = self.headers.get("If-None-Match")
+
+        if body is None:
+            status = 404
+        elif self.server.validators and conditional == etag:
+            status = 304
+        else:
+            status = 200
+        self.server.requests.append((url.path, url.query, status, conditional))
+
+        self.send_response(status)
+        if body is not None and self.server.validators:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", LAST_MODIFIED)
+        if status == 200:
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status == 200:
+            self.wfile.write(body)
+
+
+@pytest.fixture
+def sheet_server():
+    server = SheetServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Point the disk cache and the store at an empty directory, with no in-memory parses."""
+    monkeypatch.setattr(disk_cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(disk_cache, "_parsed", {})
+    monkeypatch.setattr(store, "_ready", set())
+    return tmp_path
@@ -0,0 +1,61 @@
+import disk_cache
+
+BODY = b"team,pts\nA,101.5\nB,98.2\n"
+
+
+def test_first_fetch_downloads_and_stores_validators(sheet_server, cache_dir):
+    sheet_server.files["/standings"] = BODY
+    url = sheet_server.url("/standings")
+
+    payload = disk_cache.fetch(url, timeout=5)
+
+    assert payload.status == "downloaded"
+    assert payload.body == BODY
+    assert sheet_server.requests == [("/standings", "", 200, None)]
+    body_path, meta_path = disk_cache._paths(url)
+    assert body_path.read_bytes() == BODY
+    assert disk_cache._read_meta(meta_path)["etag"]
+
+
+def test_not_modified_reuses_cached_body(sheet_server, cache_dir):
+    sheet_server.files["/standings"] = BODY
+    url = sheet_server.url("/standings")
+    first = disk_cache.fetch(url, timeout=5)
+
+    second = disk_cache.fetch(url, timeout=5)
+
+    assert second.status == "not-modified"
+    assert second.body == BODY
+    assert second.digest == first.digest
+    _, _, status, conditional = sheet_server.requests[-1]
+    assert (status, conditional) == (304, disk_cache._read_meta(disk_cache._paths(url)[1])["etag"])
+
+
+def test_unchanged_body_reuses_parse(sheet_server, cache_dir):
+    sheet_server.validators = False   # every request is a full 200
+    sheet_server.files["/standings"] = BODY
+    url = sheet_server.url("/standings")
+    parses = []
+
+    def parse(body):
+        parses.append(body)
+        return object()
+
+    first = disk_cache.fetch_parsed(url, 5, parse)
+    second = disk_cache.fetch_parsed(url, 5, parse)
+
+    assert [r[2] for r in sheet_server.requests] == [200, 200]
+    assert disk_cache.fetch(url, timeout=5).status == "unchanged"
+    assert second is first
+    assert parses == [BODY]
+
+
+def test_changed_body_is_parsed_again(sheet_server, cache_dir):
+    sheet_server.files["/standings"] = BODY
+    url = sheet_server.url("/standings")
+    disk_cache.fetch_parsed(url, 5, bytes.decode)
+
+    sheet_server.files["/standings"] = BODY + b"C,120.0\n"
+
+    assert disk_cache.fetch_parsed(url, 5, bytes.decode).endswith("C,120.0\n")
+    assert disk_cache.fetch(url, timeout=5).status == "not-modified"
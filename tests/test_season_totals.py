@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics import SeasonTotals
+
+
+def league(weeks, teams=("A", "B", "C", "D"), seed=0, seasons=None):
+    """Round-robin matchups (both rows of every game) with random scores."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for season in seasons or [None]:
+        for week in weeks:
+            order = np.roll(np.array(teams), week)
+            for team, opp in zip(order[::2], order[1::2]):
+                for a, b in ((team, opp), (opp, team)):
+                    rows.append({"season": season, "week": week, "team": a, "opp": b, "pts": round(rng.normal(100, 15), 2)})
+    frame = pd.DataFrame(rows)
+    return frame.drop(columns="season") if seasons is None else frame
+
+
+def plain_totals(matchups):
+    """The leaderboard recomputed from scratch with a plain groupby."""
+    pf = matchups.groupby("team")["pts"].sum()
+    pa = matchups.groupby("opp")["pts"].sum()
+    board = pd.DataFrame({"PF": pf, "PA": pa}).fillna(0).round(2)
+    board["Diff"] = board["PF"] - board["PA"]
+    return board.rename_axis("team").sort_index()
+
+
+def assert_matches_plain(totals, matchups):
+    board = totals.update(matchups).set_index("team").sort_index()
+    pd.testing.assert_frame_equal(board, plain_totals(matchups), check_exact=False, atol=1e-6)
+
+
+@pytest.mark.parametrize("seasons", [None, [2024, 2025]])
+def test_added_weeks(seasons):
+    totals = SeasonTotals()
+    assert_matches_plain(totals, league(range(1, 4), seasons=seasons))
+    assert_matches_plain(totals, league(range(1, 7), seasons=seasons))
+
+
+def test_corrected_week():
+    totals = SeasonTotals()
+    matchups = league(range(1, 6))
+    assert_matches_plain(totals, matchups)
+
+    corrected = matchups.copy()
+    corrected.loc[corrected["week"] == 3, "pts"] += 7.5   # a stat correction
+    assert_matches_plain(totals, corrected)
+
+
+def test_removed_weeks():
+    totals = SeasonTotals()
+    matchups = league(range(1, 6))
+    assert_matches_plain(totals, matchups)
+    assert_matches_plain(totals, matchups[matchups["week"] != 2])
+    assert_matches_plain(totals, matchups[matchups["week"] <= 1])
+
+
+def test_renamed_team_leaves_the_board():
+    totals = SeasonTotals()
+    matchups = league(range(1, 6))
+    assert_matches_plain(totals, matchups)
+
+    renamed = matchups.replace({"team": {"A": "Aces"}, "opp": {"A": "Aces"}})
+    assert_matches_plain(totals, renamed)
+    assert "A" not in set(totals.update(renamed)["team"])
+
+
+def test_same_data_is_stable():
+    totals = SeasonTotals()
+    matchups = league(range(1, 6))
+    first = totals.update(matchups)
+    pd.testing.assert_frame_equal(totals.update(matchups), first)
@@ -0,0 +1,108 @@
+import pandas as pd
+import pytest
+
+import leagues
+import store
+import utils
+
+NAMESPACE = ("test", "2025")
+
+
+def sheet(ids):
+    """The transactions tab's CSV with one row per id (in tab order)."""
+    frame = pd.DataFrame({
+        "id": [str(i) for i in ids],
+        "team": "Team A",
+        "details": [f"Add: Player {i} (RB)" for i in ids],
+    })
+    return frame.to_csv(index=False).encode("utf-8")
+
+
+@pytest.fixture
+def tab(sheet_server, cache_dir, monkeypatch):
+    """The tab's export URL on the local server, with a fresh ledger and no query endpoint."""
+    monkeypatch.setattr(utils, "_ledgers", {})
+    monkeypatch.setattr(leagues, "tail_url", lambda url, offset: None)
+    return sheet_server.url("/transactions")
+
+
+@pytest.fixture
+def tail(sheet_server, tab, monkeypatch):
+    """Serve the query endpoint too: `offset=N` returns the rows after the first N."""
+    monkeypatch.setattr(leagues, "tail_url", lambda url, offset: sheet_server.url(f"/transactions?offset={offset}"))
+    return tab
+
+
+def sync(server, url, ids):
+    server.files["/transactions"] = sheet(ids)
+    return utils.fetch_transactions(url, timeout=5, namespace=NAMESPACE)
+
+
+def stored_ids(frame):
+    return sorted(frame["id"].astype(str), key=int)
+
+
+def test_first_sync_stores_every_row(sheet_server, tab):
+    ledger = sync(sheet_server, tab, [1, 2, 3])
+    assert list(ledger["id"].astype(str)) == ["1", "2", "3"]
+    assert store.transactions_synced(NAMESPACE) == 3
+    assert store.last_transaction_id(NAMESPACE) == "3"
+
+
+@pytest.mark.parametrize("endpoint", ["tab", "tail"])
+def test_appended_rows(sheet_server, endpoint, request):
+    url = request.getfixturevalue(endpoint)
+    sync(sheet_server, url, [1, 2, 3])
+
+    ledger = sync(sheet_server, url, [1, 2, 3, 4, 5])
+
+    assert list(ledger["id"].astype(str)) == ["1", "2", "3", "4", "5"]
+    assert store.transactions_synced(NAMESPACE) == 5
+    if endpoint == "tail":
+        # Only the rows from the last stored one on were downloaded
+        assert sheet_server.requests[-1][:3] == ("/transactions", "offset=2", 200)
+
+
+@pytest.mark.parametrize("before, after", [
+    ([1, 2, 3], [1, 3, 4]),         # a row removed, one appended
+    ([3, 2, 1], [5, 4, 3, 2, 1]),   # newest first
+    ([1, 2, 3], [1, 9, 2, 3]),      # inserted above the last stored row
+])
+def test_reordered_or_removed_rows_resync_by_id(sheet_server, tail, before, after):
+    sync(sheet_server, tail, before)
+
+    ledger = sync(sheet_server, tail, after)
+
+    assert stored_ids(ledger) == sorted({str(i) for i in before + after}, key=int)
+    assert ledger["id"].is_unique
+    # The query endpoint's first row didn't match, so the full export was read
+    assert sheet_server.requests[-1][:2] == ("/transactions", "")
+
+
+def test_duplicate_and_blank_ids_are_skipped(sheet_server, tab):
+    body = b"id,team,details\n1,Team A,Add: P1 (RB)\n1,Team B,Add: P1 (RB)\n,Team C,Add: P2 (WR)\n  ,Team C,Lineup\n2,Team D,Drop: P3 (TE)\n"
+    sheet_server.files["/transactions"] = body
+
+    ledger = utils.fetch_transactions(tab, timeout=5, namespace=NAMESPACE)
+
+    assert list(ledger["id"].astype(str)) == ["1", "2"]
+    assert list(ledger["team"].astype(str)) == ["Team A", "Team D"]   # the first row with an id wins
+    assert list(store.read_transactions(NAMESPACE)["id"]) == ["1", "2"]
+
+
+@pytest.mark.parametrize("endpoint", ["tab", "tail"])
+def test_nothing_new_returns_the_same_frame(sheet_server, endpoint, request):
+    url = request.getfixturevalue(endpoint)
+    first = sync(sheet_server, url, [1, 2, 3])
+
+    assert sync(sheet_server, url, [1, 2, 3]) is first
+    assert sync(sheet_server, url, [3, 1, 2]) is first   # same ids, new order
+
+
+def test_ledger_survives_a_restart(sheet_server, tab, monkeypatch):
+    sync(sheet_server, tab, [1, 2, 3])
+    monkeypatch.setattr(utils, "_ledgers", {})   # a new process reads the store
+
+    ledger = sync(sheet_server, tab, [1, 2, 3, 4])
+
+    assert list(ledger["id"].astype(str)) == ["1", "2", "3", "4"]
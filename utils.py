@@ -1,48 +1,333 @@
+import functools
+import io
+import logging
+import os
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
 import pandas as pd
 import streamlit as st
 
-# === Replace these with your own CSV export URLs ===
-STANDINGS_URL = "https://docs.google.com/spreadsheets/d/18JjC_OdQrs1uu4hrUdUTm_4CGhy3kPIm3EOPAC9b18U/export?format=csv&gid=1760588931"
-ALLPLAY_URL   = "https://docs.google.com/spreadsheets/d/18JjC_OdQrs1uu4hrUdUTm_4CGhy3kPIm3EOPAC9b18U/export?format=csv&gid=457551150"
-INJURIES_URL  = "https://docs.google.com/spreadsheets/d/18JjC_OdQrs1uu4hrUdUTm_4CGhy3kPIm3EOPAC9b18U/export?format=csv&gid=818211409"
-POWER_URL     = "https://docs.google.com/spreadsheets/d/18JjC_OdQrs1uu4hrUdUTm_4CGhy3kPIm3EOPAC9b18U/export?format=csv&gid=1068946133"
-MATCHUPS_URL  = "https://docs.google.com/spreadsheets/d/18JjC_OdQrs1uu4hrUdUTm_4CGhy3kPIm3EOPAC9b18U/export?format=csv&gid=1393390675"
-TRANSACTIONS_URL = "https://docs.google.com/spreadsheets/d/18JjC_OdQrs1uu4hrUdUTm_4CGhy3kPIm3EOPAC9b18U/export?format=csv&gid=622740068"
-@st.cache_data(ttl=300)
-def load_csv(url):
+import analytics
+import clustering
+import disk_cache
+import figcache
+import leagues
+import store
+from analytics import allplay_standings
+from playoffs import playoff_odds
+from datalayer import DataView
+from refresh import REFRESH_SECONDS, Refresher
+from schema import apply_schema, clean_headers
+
+LOAD_TIMEOUT = 20  # seconds allowed per source before it is reported as timed out
+
+# Tabs of the default league, fetched together by load_all(); every league in
+# leagues.py carries its own. Stays a plain dict so scripts can repoint it.
+SOURCES = leagues.DEFAULT.sources
+
+# Resident memory allowed for loaded leagues; the least recently used
+# (league, season) namespaces are unloaded past it and reload from disk.
+MEMORY_BUDGET = int(float(os.environ.get("FANTASY_MEMORY_MB", "512")) * 2**20)
+
+# Completed transactions are append-only: ingest only rows past those already
+# in the local store (store.py). FANTASY_INCREMENTAL_TRANSACTIONS=0 refetches the whole tab.
+INCREMENTAL_TRANSACTIONS = os.environ.get("FANTASY_INCREMENTAL_TRANSACTIONS", "1") not in ("", "0")
+
+# Partial reruns: st.fragment, or st.experimental_fragment on older Streamlit; else a plain function
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda fn: fn)
+
+log = logging.getLogger(__name__)
+
+
+def _parse_csv(raw):
+    return pd.read_csv(io.BytesIO(raw), keep_default_na=False, dtype=str)
+
+
+def fetch_csv(url, timeout=LOAD_TIMEOUT, table=None):
+    """
+    Download and parse one CSV export through the on-disk cache. Unchanged
+    sheets are revalidated, not re-downloaded or re-parsed. When `table` names
+    a schema the frame comes back typed. Raises on errors.
+    """
+    return disk_cache.fetch_parsed(url, timeout, _parser(table))
+
+
+@functools.lru_cache(maxsize=None)
+def _parser(table):
+    """One parser per table, so disk_cache can reuse its parses (it keys them by parser)."""
+    if table is None:
+        return _parse_csv
+    return lambda raw: apply_schema(table, _parse_csv(raw))
+
+
+# namespace -> (raw ledger, typed ledger): the store's transactions, kept in memory between refreshes
+_ledgers = {}
+
+
+def _ledger(namespace):
+    if namespace not in _ledgers:
+        raw = store.read_transactions(namespace)
+        _ledgers[namespace] = (raw, apply_schema("transactions", raw))
+    return _ledgers[namespace]
+
+
+def _id_column(raw):
+    return next((c for c, clean in zip(raw.columns, clean_headers(raw.columns)) if clean.lower() == "id"), None)
+
+
+def _fetch_tail(url, offset, timeout, namespace):
+    """
+    Rows from sheet row `offset - 1` on, through the Sheets query endpoint.
+    The first row must be the last transaction stored: that proves nothing
+    was inserted, removed or reordered above it. Returns None (resync from
+    the full export) when the endpoint is unavailable or the check fails.
+    """
+    tail = leagues.tail_url(url, offset - 1)
+    if tail is None:
+        return None
+    try:
+        with urllib.request.urlopen(tail, timeout=timeout) as resp:
+            body = resp.read()
+        raw = _parse_csv(body) if body.strip() else pd.DataFrame()
+    except Exception as e:
+        log.warning("Incremental transactions fetch failed (%s); falling back to the full export", e)
+        return None
+    id_col = _id_column(raw)
+    if raw.empty or id_col is None or raw[id_col].iloc[0].strip() != store.last_transaction_id(namespace):
+        log.info("Transactions tab changed above row %d; resyncing from the full export", offset)
+        return None
+    return raw
+
+
+def fetch_transactions(url, timeout=LOAD_TIMEOUT, namespace=None):
+    """
+    The transactions log for `namespace`, read from the local store after
+    ingesting whatever the sheet has added since the last call. Transactions
+    are keyed by id: rows whose id is already stored are skipped, wherever
+    they sit in the tab. When the tab has only grown since the last sync (its
+    row before the new ones is the last id stored), just the new rows are
+    downloaded through the query endpoint; otherwise every row of the full
+    export is offered to the store. Returns the same frame object when
+    nothing new arrived, so the data version doesn't change.
+    """
+    ledger_raw, ledger = _ledger(namespace)
+    offset = store.transactions_synced(namespace)
+
+    raw = _fetch_tail(url, offset, timeout, namespace) if offset else None
+    if raw is not None and set(raw.columns) != set(ledger_raw.columns):
+        raw = None   # headers changed or didn't survive the query; resync from the export
+    if raw is not None:
+        sheet_rows = offset - 1 + len(raw)
+    else:
+        raw = disk_cache.fetch_parsed(url, timeout, _parse_csv)
+        sheet_rows = len(raw)
+
+    id_col = _id_column(raw)
+    if id_col is None:
+        return apply_schema("transactions", raw)   # no ids to key on; serve the tab as is
+
+    added = store.append_transactions(raw, id_col, sheet_rows, namespace)
+    if added.empty and not ledger_raw.empty:
+        return ledger
+    ledger_raw = pd.concat([ledger_raw, added], ignore_index=True) if not ledger_raw.empty else added.reset_index(drop=True)
+    ledger = apply_schema("transactions", ledger_raw)
+    _ledgers[namespace] = (ledger_raw, ledger)
+    log.info("Ingested %d new transactions (%d stored)", len(added), len(ledger))
+    return ledger
+
+
+def _timed_fetch(name, url, timeout, namespace=None):
+    start = time.perf_counter()
     try:
-        return pd.read_csv(url, keep_default_na=False, dtype=str)
+        if name == "transactions" and INCREMENTAL_TRANSACTIONS:
+            return fetch_transactions(url, timeout, namespace), None, time.perf_counter() - start
+        return fetch_csv(url, timeout, table=name), None, time.perf_counter() - start
     except Exception as e:
-        st.warning(f"⚠️ Could not load {url}: {e}")
-        return pd.DataFrame()
-
-def load_all():
-    return {
-        "standings": load_csv(STANDINGS_URL),
-        "allplay":   load_csv(ALLPLAY_URL),
-        "injuries":  load_csv(INJURIES_URL),
-        "power":     load_csv(POWER_URL),
-        "matchups":  load_csv(MATCHUPS_URL),
-    }
+        return pd.DataFrame(), str(e), time.perf_counter() - start
+
+
+def fetch_all(sources, timeout=LOAD_TIMEOUT, namespace=None):
+    """
+    Fetch every source concurrently, typed by its schema. `namespace` is the
+    (league, season) whose snapshot store the All-Play standings go to.
+    Returns (frames, timings, errors) keyed by source name; a source that fails
+    or exceeds `timeout` comes back as an empty frame with its error recorded.
+    """
+    frames, timings, errors = {}, {}, {}
+    pool = ThreadPoolExecutor(max_workers=len(sources) or 1, thread_name_prefix="load_all")
+    futures = {pool.submit(_timed_fetch, name, url, timeout, namespace): name for name, url in sources.items()}
+    done, not_done = wait(futures, timeout=timeout)
+
+    for future in done:
+        name = futures[future]
+        frames[name], err, timings[name] = future.result()
+        if err:
+            errors[name] = err
+    for future in not_done:
+        name = futures[future]
+        frames[name], timings[name] = pd.DataFrame(), float(timeout)
+        errors[name] = f"timed out after {timeout}s"
+
+    # Don't block on stragglers; their sockets time out on their own
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    log.info(
+        "fetch_all timings: %s",
+        ", ".join(f"{name}={secs:.2f}s" for name, secs in sorted(timings.items(), key=lambda kv: -kv[1])),
+    )
+
+    # One All-Play snapshot per fetch, shared by every session (see store.py)
+    try:
+        if "allplay" in frames:
+            store.record_allplay_snapshot(frames["allplay"], namespace=namespace)
+        elif not frames.get("matchups", pd.DataFrame()).empty:
+            store.record_allplay_snapshot(allplay_standings(frames["matchups"]), namespace=namespace)
+    except Exception:
+        log.exception("Could not record All-Play snapshot")
+    return frames, timings, errors
+
+
+def read_all_cached(sources, namespace=None):
+    """Typed frames for whatever the disk cache (and transactions store) already holds; no network."""
+    frames = {}
+    for name, url in sources.items():
+        try:
+            if name == "transactions" and INCREMENTAL_TRANSACTIONS and not _ledger(namespace)[1].empty:
+                frame = _ledger(namespace)[1]
+            else:
+                frame = disk_cache.read_parsed(url, _parser(name))
+        except Exception:
+            log.exception("Could not read cached %s", name)
+            frame = None
+        if frame is not None:
+            frames[name] = frame
+    return {name: frames.get(name, pd.DataFrame()) for name in sources} if frames else {}
+
+
+# namespace -> [Refresher, DataView or None], least recently used first
+_loaded = OrderedDict()
+_loaded_lock = threading.Lock()
+
+
+def _entry(league):
+    ns = league.namespace
+    with _loaded_lock:
+        entry = _loaded.get(ns)
+        if entry is None:
+            refresher = Refresher(
+                fetch=lambda: fetch_all(league.sources, LOAD_TIMEOUT, namespace=ns),
+                warm=lambda: read_all_cached(league.sources, namespace=ns),
+                interval=0 if league.archived else REFRESH_SECONDS,
+            )
+            entry = _loaded[ns] = [refresher, None]
+        _loaded.move_to_end(ns)
+    return entry
+
+
+def get_refresher(league=None):
+    """Refresh worker for `league` (default league if None), shared by every session (see refresh.py)."""
+    return _entry(league or leagues.DEFAULT)[0]
+
+
+def _unload(league, refresher):
+    refresher.stop()
+    disk_cache.forget(league.sources.values())
+    _ledgers.pop(league.namespace, None)
+    figcache.forget(league.namespace)
+    analytics.forget(league.namespace)
+    clustering.forget(league.namespace)
+    log.info("Unloaded league %s to stay within the memory budget", league.label)
+
+
+def _evict(keep):
+    """Unload least recently used namespaces (never `keep`) until loaded data fits MEMORY_BUDGET."""
+    with _loaded_lock:
+        sizes = {ns: view.nbytes() if view is not None else 0 for ns, (_, view) in _loaded.items()}
+        total = sum(sizes.values())
+        for ns in list(_loaded):
+            if total <= MEMORY_BUDGET:
+                break
+            if ns == keep:
+                continue
+            refresher, _ = _loaded.pop(ns)
+            total -= sizes[ns]
+            _unload(leagues.get(ns), refresher)
+
+
+def load_all(league=None):
+    """
+    Return a read-only DataView of the last good data for `league` (default
+    league if None), immediately. The background worker keeps it current, so
+    a page render never waits on Sheets once anything is cached. Every session
+    shares the same view per version.
+    """
+    league = league or leagues.DEFAULT
+    entry = _entry(league)
+    bundle = entry[0].current()
+    view = entry[1]
+    if view is None or view.version != bundle.version:
+        view = entry[1] = DataView(bundle.frames, bundle.version, namespace=league.namespace)
+        # The odds simulation is the slowest derived table; start it before any page asks
+        view.prefetch("playoff_odds", playoff_odds, "matchups")
+        _evict(keep=league.namespace)
+    return view
+
+
+def league_selector():
+    """Sidebar league/season picker; the choice follows the session across pages."""
+    options = list(leagues.REGISTRY)
+    if len(options) == 1:
+        return leagues.DEFAULT
+    current = st.session_state.get("league", options[0])
+    namespace = st.sidebar.selectbox(
+        "League",
+        options,
+        index=options.index(current) if current in options else 0,
+        format_func=lambda ns: leagues.REGISTRY[ns].label,
+        key="league_selector",
+    )
+    st.session_state["league"] = namespace
+    return leagues.get(namespace)
+
+
+def data_ready(league=None):
+    """Start loading `league` in the background if nothing is loaded yet; True once data is available."""
+    return get_refresher(league).prime()
+
+
+def get_data(league=None):
+    """
+    Page entry point: the shared DataView for the league picked in the sidebar
+    (or `league`), with a warning for any tab that has no data.
+    """
+    league = league or league_selector()
+    data = load_all(league)
+    for name, err in get_refresher(league).current().errors.items():
+        if data.get(name, pd.DataFrame()).empty:
+            st.warning(f"⚠️ Could not load {name}: {err}")
+    return data
+
+
 def week_selector(df, week_col="week", pts_col="pts", default_week=None):
     """
     Streamlit week selector that:
     - Excludes future weeks (where all pts are blank)
     - Defaults to the most recent week that has any valid points
     """
-    # Convert columns safely
-    df[week_col] = pd.to_numeric(df[week_col], errors="coerce")
+    # Convert columns safely (locally; `df` may be a shared frame)
+    weeks = pd.to_numeric(df[week_col], errors="coerce")
 
     # Identify completed weeks — where at least one points value exists
     if pts_col in df.columns:
-        df[pts_col] = pd.to_numeric(df[pts_col], errors="coerce")
-        week_points = (
-            df.groupby(week_col)[pts_col]
-            .apply(lambda s: s.notna().any() and s.sum() > 0)
-        )
+        pts = pd.to_numeric(df[pts_col], errors="coerce")
+        week_points = pts.groupby(weeks).apply(lambda s: s.notna().any() and s.sum() > 0)
         completed_weeks = week_points[week_points].index.tolist()
     else:
-        completed_weeks = sorted(df[week_col].dropna().unique())
+        completed_weeks = sorted(weeks.dropna().unique())
 
     completed_weeks = sorted(set(completed_weeks))
 